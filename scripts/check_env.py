@@ -68,6 +68,12 @@ def main():
     optional_packages = {
         "tqdm": "",  # 进度条，sentence-transformers可能用到
         "huggingface-hub": "",  # 下载模型可能需要
+        "pyahocorasick": "",  # 法规清洗关键词匹配加速
+        "httpx": "",  # 批量审查并发调用API
+        "onnxruntime": "",  # EMBED_BACKEND=onnx时的向量模型推理
+        "faiss-cpu": "",  # VECTOR_BACKEND=faiss时的内存向量索引
+        "orjson": "",  # API请求和结果文件的JSON序列化加速
+        "diskcache": "",  # 检索结果跨进程缓存
     }
     
     print("\n📦 核心包版本检查:")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+向量模型导出与INT8量化脚本
+将HuggingFace格式的向量模型导出为ONNX，并做INT8动态量化，
+导出的模型文件只用于查询编码：EMBED_BACKEND=onnx EMBED_ONNX_PATH=<输出目录>/model.onnx，
+EMBED_MODEL_PATH仍指向原模型目录（分词器从原模型目录加载，知识库也仍用原模型构建）
+运行: python quantize_embedding_model.py --model-path /root/models/text2vec-large-chinese --output-dir /root/models/text2vec-large-chinese-int8
+"""
+
+import os
+import sys
+import argparse
+import inspect
+
+# ONNX模型的输入名（按导出时的传参顺序）
+FORWARD_INPUT_NAMES = ('input_ids', 'attention_mask', 'token_type_ids')
+
+# 校验用的句子（长短不同，同时校验padding和attention_mask）
+VERIFY_TEXTS = ["借款人应按合同约定的期限归还借款本金并支付利息。", "保证人承担连带责任。"]
+
+def export_onnx(model_path, onnx_path, max_length=512):
+    """导出ONNX模型，输出last_hidden_state（平均池化在推理端完成）；返回(分词器, PyTorch模型)"""
+    import torch
+    from transformers import AutoTokenizer, AutoModel
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModel.from_pretrained(model_path)
+    model.eval()
+    
+    sample = tokenizer(VERIFY_TEXTS, padding=True, truncation=True, max_length=max_length, return_tensors='pt')
+    input_names = [name for name in FORWARD_INPUT_NAMES if name in sample]
+    if 'input_ids' not in input_names or 'attention_mask' not in input_names:
+        raise ValueError(f"分词器输出不符合预期: {list(sample.keys())}")
+    
+    class _NamedInputs(torch.nn.Module):
+        """按输入名以关键字参数调用模型，ONNX输入名与实际输入一一对应，不依赖forward的参数顺序"""
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+        
+        def forward(self, *inputs):
+            return self.inner(**dict(zip(input_names, inputs))).last_hidden_state
+    
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    
+    # 新版torch默认使用dynamo导出，这里固定用TorchScript导出以支持dynamic_axes
+    export_kwargs = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            _NamedInputs(model).eval(),
+            tuple(sample[name] for name in input_names),
+            onnx_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **export_kwargs
+        )
+    return tokenizer, model
+
+def _mean_pool(last_hidden_state, attention_mask):
+    """平均池化并归一化（与OnnxEmbeddingModel一致）"""
+    import numpy as np
+    
+    mask = attention_mask[..., None].astype(np.float32)
+    pooled = (last_hidden_state * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+def verify_onnx(model, tokenizer, onnx_path, min_cosine):
+    """用校验句子分别跑PyTorch模型和ONNX模型，池化后的向量余弦相似度低于min_cosine时报错"""
+    import numpy as np
+    import torch
+    import onnxruntime as ort
+    
+    encoded = tokenizer(VERIFY_TEXTS, padding=True, truncation=True, return_tensors='np')
+    with torch.no_grad():
+        torch_output = model(**{name: torch.from_numpy(value) for name, value in encoded.items()})
+    expected = _mean_pool(torch_output.last_hidden_state.numpy(), encoded['attention_mask'])
+    
+    session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+    feeds = {i.name: encoded[i.name].astype(np.int64) for i in session.get_inputs()}
+    actual = _mean_pool(session.run(None, feeds)[0], encoded['attention_mask'])
+    
+    cosine = float((expected * actual).sum(axis=1).min())
+    print(f"校验 {os.path.basename(onnx_path)}: 与PyTorch模型的最小余弦相似度 {cosine:.6f}")
+    if cosine < min_cosine:
+        raise RuntimeError(f"ONNX模型输出与PyTorch模型不一致（余弦相似度 {cosine:.6f} < {min_cosine}）")
+
+def main():
+    parser = argparse.ArgumentParser(description='向量模型导出ONNX并INT8量化')
+    parser.add_argument('--model-path', type=str,
+                       default=os.environ.get("EMBED_MODEL_PATH", "/root/models/text2vec-large-chinese"),
+                       help='原始向量模型目录')
+    parser.add_argument('--output-dir', type=str, required=True,
+                       help='输出目录（保存model.onnx）')
+    parser.add_argument('--no-quantize', action='store_true',
+                       help='只导出FP32的ONNX模型，不做INT8量化')
+    args = parser.parse_args()
+    
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError:
+        print("✗ 需要安装onnxruntime: pip install onnxruntime")
+        return 1
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    fp32_path = os.path.join(args.output_dir, "model.fp32.onnx")
+    onnx_path = os.path.join(args.output_dir, "model.onnx")
+    
+    print(f"导出ONNX模型: {args.model_path}")
+    tokenizer, model = export_onnx(args.model_path, fp32_path)
+    verify_onnx(model, tokenizer, fp32_path, min_cosine=0.9999)
+    
+    if args.no_quantize:
+        os.replace(fp32_path, onnx_path)
+    else:
+        print("INT8动态量化...")
+        quantize_dynamic(fp32_path, onnx_path, weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+        verify_onnx(model, tokenizer, onnx_path, min_cosine=0.98)
+    
+    size_mb = os.path.getsize(onnx_path) / 1024 / 1024
+    print(f"✓ 已保存: {onnx_path} ({size_mb:.1f}MB)")
+    print(f"使用方法: EMBED_BACKEND=onnx EMBED_ONNX_PATH={onnx_path} EMBED_MODEL_PATH={args.model_path} python rag.py --clause ...")
+    print("该模型只用于查询编码；知识库仍用原模型构建（EMBED_MODEL_PATH不要指向输出目录）")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@
 功能：初始化一个空的向量数据库，设置正确的数据结构和元信息
 """
 
+import os
 import sys
 import json
 from pathlib import Path
@@ -44,6 +45,9 @@ class VectorDBCreator:
             print(f"❌ 错误: 模型目录不存在: {model_path}")
             sys.exit(1)
         
+        # 模型名称（写入数据库元信息）
+        self.model_name = model_dir.name
+        
         # 创建嵌入模型实例
         try:
             self.embeddings = Text2VecEmbeddings(model_path=model_path)
@@ -93,7 +97,7 @@ class VectorDBCreator:
                 "created_at": datetime.now().isoformat(),
                 "total_files": 0,
                 "last_updated": datetime.now().isoformat(),
-                "model_info": "text2vec-large-chinese"
+                "model_info": self.model_name
             }
             
             # 初始化文档（可以添加一个系统文档）
@@ -127,7 +131,7 @@ class VectorDBCreator:
             # 保存数据库配置
             self._save_db_config(persist_directory, {
                 "collection_name": collection_name,
-                "embedding_model": "text2vec-large-chinese",
+                "embedding_model": self.model_name,
                 "created_at": datetime.now().isoformat(),
                 "version": "2.0",
                 "total_documents": 1,
@@ -220,7 +224,7 @@ def main():
     
     # ==================== 配置参数 ====================
     # 根据实际情况修改这些路径
-    LOCAL_MODEL_PATH = "/root/models/text2vec-large-chinese"  # 本地模型路径
+    LOCAL_MODEL_PATH = os.environ.get("EMBED_MODEL_PATH", "/root/models/text2vec-large-chinese")  # 本地模型路径
     PERSIST_DIR = "../../knowledge_base"  # 向量数据库保存目录
     COLLECTION_NAME = "contract_law_collection"  # 集合名称
     
@@ -253,7 +257,7 @@ def main():
     print(f"\n📊 数据库信息:")
     print(f"   位置: {PERSIST_DIR}")
     print(f"   集合: {COLLECTION_NAME}")
-    print(f"   嵌入模型: text2vec-large-chinese")
+    print(f"   嵌入模型: {Path(LOCAL_MODEL_PATH).name}")
     print(f"   相似度: 余弦相似度")
     
     print(f"\n💡 后续步骤:")
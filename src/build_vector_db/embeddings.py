@@ -65,16 +65,21 @@ class Text2VecEmbeddings(Embeddings):
         if not texts:
             return []
         
+        # 按长度排序后分批（smart batching），长度相近的文本放在同一批，减少padding带来的无效计算
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        sorted_texts = [texts[i] for i in order]
+        
         all_embeddings = []
-        for i in range(0, len(texts), self.batch_size):
-            batch_texts = texts[i:i + self.batch_size]
+        for i in range(0, len(sorted_texts), self.batch_size):
+            batch_texts = sorted_texts[i:i + self.batch_size]
             batch_embeddings = self._encode_batch(batch_texts)
             all_embeddings.append(batch_embeddings)
         
-        if all_embeddings:
-            all_embeddings = np.vstack(all_embeddings)
+        # 恢复为输入顺序
+        embeddings = np.empty((len(texts), all_embeddings[0].shape[1]), dtype=all_embeddings[0].dtype)
+        embeddings[order] = np.vstack(all_embeddings)
         
-        return all_embeddings.tolist()
+        return embeddings.tolist()
     
     def embed_query(self, text: str) -> List[float]:
         """为查询生成嵌入"""
@@ -456,7 +456,7 @@ def main():
     print("=" * 70)
     
     # ==================== 配置参数 ====================
-    LOCAL_MODEL_PATH = "/root/models/text2vec-large-chinese"
+    LOCAL_MODEL_PATH = os.environ.get("EMBED_MODEL_PATH", "/root/models/text2vec-large-chinese")
     PERSIST_DIR = "../../knowledge_base"
     COLLECTION_NAME = "contract_law_collection"
     
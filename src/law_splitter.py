@@ -1,5 +1,7 @@
+import io
 import os
 import re
+from collections import Counter, defaultdict
 from typing import List, Dict, Any
 from pathlib import Path
 from docx import Document
@@ -36,6 +38,12 @@ class UniversalLegalTextSplitter:
             # 字母编号: a)、b) 或 A、B
             r'[a-zA-Z][)、.][^\n]*',
         ]
+        
+        # 预编译模式；含\d的模式只需匹配ASCII数字，使用re.ASCII走更快的匹配路径
+        self._compiled_patterns = [
+            re.compile(p, re.ASCII if r'\d' in p else 0)
+            for p in self.clause_patterns
+        ]
     
     def split_by_clauses(self, text: str) -> List[str]:
         """
@@ -47,16 +55,13 @@ class UniversalLegalTextSplitter:
         Returns:
             分割后的条款列表
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             return []
         
-        # 组合所有模式
-        combined_pattern = '(' + '|'.join(self.clause_patterns) + ')'
-        
         # 查找所有条款开始位置
         clause_starts = []
-        for pattern in self.clause_patterns:
-            for match in re.finditer(pattern, text):
+        for pattern in self._compiled_patterns:
+            for match in pattern.finditer(text):
                 clause_starts.append((match.start(), match.group()))
         
         # 去重并排序
@@ -64,7 +69,8 @@ class UniversalLegalTextSplitter:
         
         # 如果没有找到条款，将整个文本作为一个块
         if not clause_starts:
-            return [text.strip()] if len(text.strip()) >= self.min_chunk_length else []
+            stripped = text.strip()
+            return [stripped] if len(stripped) >= self.min_chunk_length else []
         
         chunks = []
         
@@ -102,8 +108,8 @@ class UniversalLegalTextSplitter:
         Returns:
             条款类型描述
         """
-        for i, pattern in enumerate(self.clause_patterns):
-            if re.match(pattern, text):
+        for i, pattern in enumerate(self._compiled_patterns):
+            if pattern.match(text):
                 types = [
                     "中文条款", "数字条款", "章节标题", "小节标题", 
                     "编号条款", "中文序号", "括号中文", "括号数字",
@@ -161,11 +167,11 @@ class UniversalLegalDocumentProcessor:
             print(f"目录不存在: {self.laws_dir}")
             return []
         
-        # 支持多种文档扩展名
-        extensions = ["*.docx", "*.doc"]
-        doc_files = []
-        for ext in extensions:
-            doc_files.extend(list(self.laws_dir.glob(ext)))
+        # 支持多种文档扩展名（单次扫描目录，按后缀过滤）
+        extensions = ('.docx', '.doc')
+        with os.scandir(self.laws_dir) as entries:
+            doc_files = [Path(e.path) for e in entries
+                         if e.is_file() and e.name.lower().endswith(extensions)]
         
         print(f"找到 {len(doc_files)} 个文档文件")
         
@@ -189,22 +195,27 @@ class UniversalLegalDocumentProcessor:
             self.load_all_documents()
         
         all_chunks = []
+        append = all_chunks.append
+        split = self.splitter.split_by_clauses
+        detect = self.splitter.detect_clause_type
         
         for doc in self.docs:
             if not doc['extraction_success']:
                 continue
             
-            print(f"分割文档: {doc['file_name']}")
+            source, file_path = doc['file_name'], doc['file_path']
+            print(f"分割文档: {source}")
             
             # 使用条款分割
-            chunks = self.splitter.split_by_clauses(doc['full_text'])
+            chunks = split(doc['full_text'])
+            total = len(chunks)
             
-            print(f"  分割为 {len(chunks)} 个块")
+            print(f"  分割为 {total} 个块")
             
             # 添加元数据
             for i, chunk in enumerate(chunks):
                 # 检测条款类型
-                clause_type = self.splitter.detect_clause_type(chunk)
+                clause_type = detect(chunk)
                 
                 # 提取条款标题（如果存在）
                 clause_header = "普通文本"
@@ -214,17 +225,16 @@ class UniversalLegalDocumentProcessor:
                     if len(clause_header) > 30:
                         clause_header = clause_header[:30] + "..."
                 
-                all_chunks.append({
+                append({
                     'text': chunk,
                     'metadata': {
-                        'source': doc['file_name'],
-                        'file_path': doc['file_path'],
+                        'source': source,
+                        'file_path': file_path,
                         'chunk_index': i,
-                        'total_chunks_in_doc': len(chunks),
+                        'total_chunks_in_doc': total,
                         'chunk_size': len(chunk),
                         'clause_type': clause_type,
-                        'clause_header': clause_header,
-                        'chunk_preview': chunk[:100].replace('\n', ' ') + ("..." if len(chunk) > 100 else "")
+                        'clause_header': clause_header
                     }
                 })
         
@@ -236,12 +246,9 @@ class UniversalLegalDocumentProcessor:
         output_path.mkdir(parents=True, exist_ok=True)
         
         # 按文档分组
-        docs_groups = {}
+        docs_groups = defaultdict(list)
         for chunk in chunks:
-            source = chunk['metadata']['source']
-            if source not in docs_groups:
-                docs_groups[source] = []
-            docs_groups[source].append(chunk)
+            docs_groups[chunk['metadata']['source']].append(chunk)
         
         # 为每个文档创建文件夹并保存
         doc_folders = {}
@@ -252,8 +259,7 @@ class UniversalLegalDocumentProcessor:
             doc_folder.mkdir(exist_ok=True)
             doc_folders[source] = str(doc_folder)
             
-            # 按块索引排序
-            doc_chunks.sort(key=lambda x: x['metadata']['chunk_index'])
+            # process_documents 按块索引顺序生成，分组保持插入顺序，无需再排序
             
             # 保存该文档的块到自己的文件夹
             doc_json_path = doc_folder / "chunks.json"
@@ -278,54 +284,54 @@ class UniversalLegalDocumentProcessor:
     
     def _write_document_statistics(self, f, source: str, doc_chunks: List[Dict[str, Any]]):
         """写入单个文档的统计信息"""
-        f.write("=" * 80 + "\n")
-        f.write(f"文档分割统计: {source}\n")
-        f.write("=" * 80 + "\n\n")
+        buf = io.StringIO()
+        w = buf.write
+        
+        w("=" * 80 + "\n")
+        w(f"文档分割统计: {source}\n")
+        w("=" * 80 + "\n\n")
         
-        f.write(f"📊 文档统计\n")
-        f.write(f"  文档名称: {source}\n")
-        f.write(f"  总块数: {len(doc_chunks)}\n")
+        w(f"📊 文档统计\n")
+        w(f"  文档名称: {source}\n")
+        w(f"  总块数: {len(doc_chunks)}\n")
         
         if doc_chunks:
             avg_chunk_size = sum(len(c['text']) for c in doc_chunks) / len(doc_chunks)
             max_chunk_size = max(len(c['text']) for c in doc_chunks)
             min_chunk_size = min(len(c['text']) for c in doc_chunks)
             
-            f.write(f"  平均块大小: {avg_chunk_size:.0f} 字符\n")
-            f.write(f"  最大块大小: {max_chunk_size} 字符\n")
-            f.write(f"  最小块大小: {min_chunk_size} 字符\n")
+            w(f"  平均块大小: {avg_chunk_size:.0f} 字符\n")
+            w(f"  最大块大小: {max_chunk_size} 字符\n")
+            w(f"  最小块大小: {min_chunk_size} 字符\n")
             
             # 按条款类型统计
-            clause_types = {}
-            for chunk in doc_chunks:
-                clause_type = chunk['metadata']['clause_type']
-                clause_types[clause_type] = clause_types.get(clause_type, 0) + 1
+            clause_types = Counter(c['metadata']['clause_type'] for c in doc_chunks)
             
-            f.write(f"\n📋 条款类型统计\n")
-            for clause_type, count in sorted(clause_types.items(), key=lambda x: x[1], reverse=True):
+            w(f"\n📋 条款类型统计\n")
+            for clause_type, count in clause_types.most_common():
                 percentage = count / len(doc_chunks) * 100
-                f.write(f"  {clause_type}: {count} 个块 ({percentage:.1f}%)\n")
+                w(f"  {clause_type}: {count} 个块 ({percentage:.1f}%)\n")
             
             # 检查连续性
             indices = [c['metadata']['chunk_index'] for c in doc_chunks]
             if indices:
-                min_idx = min(indices)
-                max_idx = max(indices)
-                
-                # 找出缺失的索引
-                all_indices = set(range(min_idx, max_idx + 1))
-                present_indices = set(indices)
-                missing_indices = sorted(all_indices - present_indices)
+                # 找出缺失的索引（索引已按顺序排列，单次扫描即可发现间隙）
+                missing_indices = []
+                prev = indices[0]
+                for idx in indices[1:]:
+                    if idx != prev + 1:
+                        missing_indices.extend(range(prev + 1, idx))
+                    prev = idx
                 
                 if missing_indices:
-                    f.write(f"\n⚠ 连续性检查\n")
-                    f.write(f"  缺失块索引: {missing_indices}\n")
-                    f.write(f"  缺失块数量: {len(missing_indices)}\n")
+                    w(f"\n⚠ 连续性检查\n")
+                    w(f"  缺失块索引: {missing_indices}\n")
+                    w(f"  缺失块数量: {len(missing_indices)}\n")
             
             # 列出所有块
-            f.write(f"\n{'─' * 60}\n")
-            f.write(f"详细块列表 (共{len(doc_chunks)}个块):\n")
-            f.write(f"{'─' * 60}\n")
+            w(f"\n{'─' * 60}\n")
+            w(f"详细块列表 (共{len(doc_chunks)}个块):\n")
+            w(f"{'─' * 60}\n")
             
             for chunk in doc_chunks:
                 idx = chunk['metadata']['chunk_index']
@@ -338,36 +344,41 @@ class UniversalLegalDocumentProcessor:
                 if len(chunk['text']) > 80:
                     preview += "..."
                 
-                f.write(f"块 {idx:3d}: [{clause_type}] {clause_header} ({size:4d}字符)\n")
-                f.write(f"     预览: {preview}\n")
+                w(f"块 {idx:3d}: [{clause_type}] {clause_header} ({size:4d}字符)\n")
+                w(f"     预览: {preview}\n")
+        
+        f.write(buf.getvalue())
     
     def _write_overall_statistics(self, f, chunks: List[Dict[str, Any]], 
                                  docs_groups: Dict[str, List], doc_folders: Dict[str, str]):
         """写入总体统计信息"""
-        f.write("=" * 80 + "\n")
-        f.write("法律文档分割总体统计报告\n")
-        f.write("=" * 80 + "\n\n")
+        buf = io.StringIO()
+        w = buf.write
+        
+        w("=" * 80 + "\n")
+        w("法律文档分割总体统计报告\n")
+        w("=" * 80 + "\n\n")
         
         # 总体统计
-        f.write(f"📊 总体统计\n")
-        f.write(f"  文档总数: {len(docs_groups)}\n")
-        f.write(f"  总块数: {len(chunks)}\n")
+        w(f"📊 总体统计\n")
+        w(f"  文档总数: {len(docs_groups)}\n")
+        w(f"  总块数: {len(chunks)}\n")
         
         if chunks:
             avg_chunk_size = sum(len(c['text']) for c in chunks) / len(chunks)
-            f.write(f"  平均块大小: {avg_chunk_size:.0f} 字符\n")
+            w(f"  平均块大小: {avg_chunk_size:.0f} 字符\n")
         
         # 各文档统计摘要
-        f.write(f"\n📁 各文档统计摘要\n")
+        w(f"\n📁 各文档统计摘要\n")
         for source, doc_chunks in docs_groups.items():
             doc_name = Path(source).stem
             folder_path = doc_folders[source]
             avg_size = sum(len(c['text']) for c in doc_chunks) / len(doc_chunks) if doc_chunks else 0
             
-            f.write(f"\n  📄 文档: {source}\n")
-            f.write(f"    块数: {len(doc_chunks)}\n")
-            f.write(f"    平均块大小: {avg_size:.0f} 字符\n")
-            f.write(f"    保存位置: {folder_path}/\n")
+            w(f"\n  📄 文档: {source}\n")
+            w(f"    块数: {len(doc_chunks)}\n")
+            w(f"    平均块大小: {avg_size:.0f} 字符\n")
+            w(f"    保存位置: {folder_path}/\n")
             
             # 检查连续性
             indices = [c['metadata']['chunk_index'] for c in doc_chunks]
@@ -378,25 +389,24 @@ class UniversalLegalDocumentProcessor:
                 actual_count = len(doc_chunks)
                 
                 if expected_count != actual_count:
-                    f.write(f"    ⚠ 连续性警告: 应有{expected_count}个块，实际{actual_count}个块\n")
+                    w(f"    ⚠ 连续性警告: 应有{expected_count}个块，实际{actual_count}个块\n")
         
         # 条款类型分布
-        f.write(f"\n📋 总体条款类型分布\n")
-        clause_types = {}
-        for chunk in chunks:
-            clause_type = chunk['metadata']['clause_type']
-            clause_types[clause_type] = clause_types.get(clause_type, 0) + 1
+        w(f"\n📋 总体条款类型分布\n")
+        clause_types = Counter(c['metadata']['clause_type'] for c in chunks)
         
-        for clause_type, count in sorted(clause_types.items(), key=lambda x: x[1], reverse=True):
+        for clause_type, count in clause_types.most_common():
             percentage = count / len(chunks) * 100
-            f.write(f"  {clause_type}: {count} 个块 ({percentage:.1f}%)\n")
+            w(f"  {clause_type}: {count} 个块 ({percentage:.1f}%)\n")
         
         # 保存位置信息
-        f.write(f"\n💾 文件保存位置\n")
-        f.write(f"  总统计文件: {Path.cwd() / 'law_chunks' / 'split_statistics.txt'}\n")
-        f.write(f"  各文档分割结果:\n")
+        w(f"\n💾 文件保存位置\n")
+        w(f"  总统计文件: {Path.cwd() / 'law_chunks' / 'split_statistics.txt'}\n")
+        w(f"  各文档分割结果:\n")
         for source, folder_path in doc_folders.items():
-            f.write(f"    • {source}: {folder_path}/\n")
+            w(f"    • {source}: {folder_path}/\n")
+        
+        f.write(buf.getvalue())
 
 def main():
     """主函数"""
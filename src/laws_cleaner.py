@@ -1,25 +1,193 @@
 import os
 import re
+import functools
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import docx
 from docx import Document
 from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
 import logging
-from typing import List, Dict, Optional, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+try:
+    import ahocorasick  # pyahocorasick，可选依赖
+except ImportError:
+    ahocorasick = None
+
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# WordprocessingML 元素标签
+_W_P, _W_R, _W_TBL, _W_TR, _W_TC = (qn(tag) for tag in ('w:p', 'w:r', 'w:tbl', 'w:tr', 'w:tc'))
+
+# 正则元字符，不含这些字符的关键词可按纯文本匹配
+_REGEX_METACHARS = frozenset('.^$*+?{}[]|()\\')
+
+
+class _KeywordMatcher:
+    """多关键词子串匹配器
+    
+    安装了pyahocorasick时使用Aho-Corasick自动机，对文本只扫描一遍即可判断是否命中任一关键词；
+    否则退回到预编译的正则交替。
+    """
+    
+    def __init__(self, keywords: List[str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        if ignore_case:
+            keywords = [keyword.lower() for keyword in keywords]
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+            self._pattern = None
+        else:
+            self._automaton = None
+            self._pattern = re.compile('|'.join(map(re.escape, keywords)))
+    
+    def search(self, text: str) -> bool:
+        """文本中是否包含任一关键词"""
+        if self.ignore_case:
+            text = text.lower()
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return self._pattern.search(text) is not None
+
+# 中文数字转阿拉伯数字
+_CN2NUM = {
+    '一': '1', '二': '2', '三': '3', '四': '4', '五': '5',
+    '六': '6', '七': '7', '八': '8', '九': '9', '十': '10',
+    '十一': '11', '十二': '12', '十三': '13', '十四': '14', '十五': '15',
+    '十六': '16', '十七': '17', '十八': '18', '十九': '19', '二十': '20'
+}
+
+
+# 内容标准化（条款编号、日期、法律引用、金额和数字）合并为一个正则，每段只扫描一遍，
+# 由 _standardize_repl 按命中的分支分派替换
+_STANDARDIZE_RE = re.compile(
+    # 法律引用：《标题》第N条
+    r'(?P<law>《\s*(?P<law_title>[^》]+)\s*》\s*第\s*(?P<law_num>\d+|[一二三四五六七八九十]+)\s*条)'
+    # 中文数字条款编号：第X章/节/条/款、(X)
+    r'|(?P<clause>第(?P<clause_num>[一二三四五六七八九十])(?P<clause_unit>[章节条款]))'
+    r'|(?P<paren>\((?P<paren_num>[一二三四五六七八九十])\))'
+    # 日期：2020-1-1、2020/1/1、2020.1.1、2020年1月1号
+    r'|(?P<date>\d{4}(?:[-/]\d{1,2}[-/]\d{1,2}|\.\d{1,2}\.\d{1,2}|年\d{1,2}月\d{1,2}号))'
+    # 金额：带千分位的数字（可连续多组）或"元人民币"前的数字
+    r'|(?P<amount>(?:(?:\d+[,，]\d{3})+\d*|\d+(?=元人民币))(?:元人民币)?)'
+    # 百分比：百分之N
+    r'|(?P<percent>百分之(?=\d)(?:\d+[,，]\d{3})*\d*(?:元人民币)?)'
+)
+_DIGITS_RE = re.compile(r'\d+')
+# 各分支都至少包含其中一个字符（"第"、"("、"《"或数字），不含这些字符的段落无需替换
+_STANDARDIZE_TRIGGER_RE = re.compile(r'[第(《\d]')
+
+
+def _standardize_repl(m: re.Match) -> str:
+    """内容标准化替换回调"""
+    kind = m.lastgroup
+    if kind == 'law':
+        # 标题内的条款编号、日期、数字同样需要标准化
+        title = _STANDARDIZE_RE.sub(_standardize_repl, m.group('law_title'))
+        num = m.group('law_num')
+        return f'《{title}》第{_CN2NUM.get(num, num)}条'
+    if kind == 'clause':
+        return f"第{_CN2NUM[m.group('clause_num')]}{m.group('clause_unit')}"
+    if kind == 'paren':
+        return f"({_CN2NUM[m.group('paren_num')]})"
+    if kind == 'date':
+        # 统一日期格式为 YYYY年MM月DD日
+        year, month, day = _DIGITS_RE.findall(m.group())
+        return f'{year}年{month}月{day}日'
+    
+    # 金额和百分比：移除千分位逗号，"元人民币"统一为"元"
+    text = m.group()
+    is_yuan = text.endswith('元人民币')
+    if is_yuan:
+        text = text[:-4]
+    if kind == 'percent':
+        text = text[3:] + '%'
+    text = text.replace(',', '').replace('，', '')
+    return text + '元' if is_yuan else text
+
+
+class LawParagraph:
+    """清洗过程中的段落记录（__slots__固定字段，比dict更省内存，属性访问也更快）"""
+    
+    __slots__ = ('text', 'style', 'font_size', 'is_bold', 'is_italic', 'alignment',
+                 'is_law_section', 'hierarchy_level')
+    
+    def __init__(self, text: str, style: str = 'Normal', font_size: float = 11.0,
+                 is_bold: bool = False, is_italic: bool = False, alignment: str = 'LEFT',
+                 is_law_section: bool = False, hierarchy_level: int = 0):
+        self.text = text
+        self.style = style
+        self.font_size = font_size
+        self.is_bold = is_bold
+        self.is_italic = is_italic
+        self.alignment = alignment
+        self.is_law_section = is_law_section  # 是否是法律法规关键部分
+        self.hierarchy_level = hierarchy_level  # 层级
+
 class LawDocumentCleaner:
     """法律法规文档清洗器"""
     
+    # 以下正则在类定义时编译一次，避免每个段落都重新查找正则缓存
+    # 页眉页脚文本指示词（匹配小写文本）
+    _HEADER_FOOTER_INDICATORS = [re.compile(p) for p in (
+        'confidential', 'internal', 'draft',
+        'page', '页码', '第.*页',
+        '文件编号', 'document no',
+        '印发日期', '发布日期'
+    )]
+    
+    # 文件头信息
+    _DOCUMENT_HEADER_PATTERNS = [re.compile(p) for p in (
+        r'.*令第\d+号',
+        r'.*公告第\d+号',
+        r'.*通知第\d+号',
+        r'^【.*】$',
+        r'^〔.*〕$'
+    )]
+    
+    # 文件编号括号 / 制表符（"是否包含其中任一字符"用集合判断，在C层完成）
+    _FILE_NUMBER_BRACKETS = frozenset('〔]【】')
+    _TABLE_CHARS = frozenset('┌┐└┘├┤┬┴─│┃')
+    
+    # 列表/引用符号开头的段落保留特殊符号（另有"数字."开头的编号列表）
+    _KEEP_PREFIX_CHARS = frozenset('•-（(《[')
+    
+    # 层级标题：第X章/节/条/款 -> 层级1~4，(X) -> 层级5，一次匹配后按单位查层级
+    _HIERARCHY_RE = re.compile(
+        r'^(?:第(?:[一二三四五六七八九十]+|\d+)(?P<unit>[章节条款])'
+        r'|\((?:[一二三四五六七八九十]+|\d+)\))'
+    )
+    _HIERARCHY_UNIT_LEVELS = {'章': 1, '节': 2, '条': 3, '款': 4}
+    
+    # 其他重要标题关键词（层级2）
+    _TITLE_KEYWORDS = ['总则', '分则', '附则', '法律责任', '罚则']
+    
+    # 噪声模式和关键词匹配器是否已在类上构建
+    _patterns_built = False
+    
     def __init__(self):
+        # 正则和关键词匹配器在类上只构建一次，同一进程内的所有实例共享
+        self._build_patterns()
+    
+    @classmethod
+    def _build_patterns(cls):
+        """构建并缓存噪声模式、法律法规关键部分标识及其匹配器（首次实例化时执行）"""
+        if cls._patterns_built:
+            return
+        
         # 定义法律法规文档的噪声模式
-        self.noise_patterns = {
+        cls.noise_patterns = {
             'header_footer_keywords': [
                 '机密', '保密', '内部文件', '草稿', 'DRAFT',
                 '第.*页.*共.*页', 'Page.*of.*', 
@@ -54,7 +222,7 @@ class LawDocumentCleaner:
         }
         
         # 法律法规关键部分标识（这些应该保留）
-        self.law_sections = [
+        cls.law_sections = [
             # 章节标识
             '第一章', '第二章', '第三章', '第四章', '第五章',
             '第一节', '第二节', '第三节', '第四节', '第五节',
@@ -78,6 +246,38 @@ class LawDocumentCleaner:
             '办法', '条例', '规定', '细则', '决定',
             '司法解释', '批复', '答复'
         ]
+        
+        # 页眉页脚关键词（忽略大小写）：纯文本关键词交给多关键词匹配器一次扫描，其余保留为正则
+        plain_keywords, regex_keywords = [], []
+        for keyword in cls.noise_patterns['header_footer_keywords']:
+            # 末尾的".*"不影响search结果，去掉后即可按纯文本匹配
+            literal = keyword[:-2] if keyword.endswith('.*') else keyword
+            if _REGEX_METACHARS.isdisjoint(literal):
+                plain_keywords.append(literal)
+            else:
+                regex_keywords.append(keyword)
+        cls._header_footer_matcher = _KeywordMatcher(plain_keywords, ignore_case=True)
+        cls._header_footer_regexes = [re.compile(k, re.IGNORECASE) for k in regex_keywords]
+        
+        cls._law_section_matcher = _KeywordMatcher(cls.law_sections)
+        cls._title_keyword_matcher = _KeywordMatcher(cls._TITLE_KEYWORDS)
+        
+        # 页码/脚注/装饰线各自合并为一个交替正则，每段只需匹配一次（各模式均为行首锚定）
+        cls._page_number_re, cls._footnote_re, cls._decoration_re = (
+            re.compile('|'.join(f'(?:{p})' for p in cls.noise_patterns[key]))
+            for key in ('page_numbers', 'footnotes', 'decoration_lines')
+        )
+        
+        # 预编译其余噪声模式
+        for key, patterns in cls.noise_patterns.items():
+            if key == 'header_footer_keywords':
+                continue
+            if isinstance(patterns, list):
+                cls.noise_patterns[key] = [re.compile(p) for p in patterns]
+            else:
+                cls.noise_patterns[key] = re.compile(patterns)
+        
+        cls._patterns_built = True
     
     def clean_document(self, input_path: str, output_path: str) -> bool:
         """清洗单个文档"""
@@ -87,14 +287,12 @@ class LawDocumentCleaner:
             # 读取文档
             doc = Document(input_path)
             
-            # 应用各种清洗策略
-            cleaned_paragraphs = self._extract_and_clean_paragraphs(doc)
-            cleaned_paragraphs = self._remove_headers_footers(cleaned_paragraphs)
-            cleaned_paragraphs = self._remove_page_numbers(cleaned_paragraphs)
-            cleaned_paragraphs = self._remove_footnotes(cleaned_paragraphs)
-            cleaned_paragraphs = self._remove_decoration_lines(cleaned_paragraphs)
-            cleaned_paragraphs = self._clean_formatting(cleaned_paragraphs)
-            cleaned_paragraphs = self._standardize_content(cleaned_paragraphs)
+            # 应用各种清洗策略（逐段一次完成，避免多轮重建段落列表）
+            paragraphs = self._extract_and_clean_paragraphs(doc)
+            cleaned_paragraphs = [
+                p for p in (self._process_paragraph(i, para) for i, para in enumerate(paragraphs))
+                if p
+            ]
             cleaned_paragraphs = self._reconstruct_structure(cleaned_paragraphs)
             
             # 创建新文档
@@ -116,75 +314,71 @@ class LawDocumentCleaner:
             logger.error(f"清洗法律法规文档失败 {input_path}: {str(e)}")
             return False
     
-    def _extract_and_clean_paragraphs(self, doc: Document) -> List[Dict]:
+    def _extract_and_clean_paragraphs(self, doc: Document) -> List[LawParagraph]:
         """提取并初步清洗段落"""
         paragraphs = []
         
-        for para in doc.paragraphs:
-            text = para.text.strip()
+        # 直接遍历正文下的<w:p>元素（与doc.paragraphs范围相同），
+        # 不为每个段落/run/样式创建python-docx包装对象
+        body = doc.element.body
+        styles = doc.styles
+        style_names = {}  # 样式ID -> 样式名称
+        
+        for p in body.iterchildren(_W_P):
+            raw_text = p.text
+            text = raw_text.strip()
             
             # 跳过完全空的段落
             if not text:
                 continue
             
             # 检查是否是表格内容（表格通常需要特殊处理）
-            if self._is_table_content(para):
+            if self._is_table_content(raw_text):
                 continue
             
             # 检查是否是页眉页脚
-            if self._is_header_footer(para):
+            if self._is_header_footer(raw_text):
                 continue
             
-            # 收集段落信息
-            para_info = {
-                'text': text,
-                'original_text': text,  # 保留原始文本用于参考
-                'style': para.style.name if para.style else 'Normal',
-                'font_size': self._get_font_size(para),
-                'is_bold': self._is_bold(para),
-                'is_italic': self._is_italic(para),
-                'alignment': self._get_alignment(para),
-                'keep': True,  # 默认保留
-                'is_law_section': self._is_law_section(text),  # 是否是法律法规关键部分
-                'hierarchy_level': self._get_hierarchy_level(text)  # 获取层级
-            }
+            # 样式名称按样式ID缓存（未定义的样式ID回退到默认段落样式）
+            style_id = p.style
+            if style_id not in style_names:
+                style = styles.get_by_id(style_id, WD_STYLE_TYPE.PARAGRAPH)
+                style_names[style_id] = style.name if style else 'Normal'
             
-            paragraphs.append(para_info)
-        
-        # 处理表格
-        for table in doc.tables:
-            table_text = self._extract_table_text(table)
+            # 收集段落信息
+            font_size, is_bold, is_italic, alignment = self._get_paragraph_format(p)
+            paragraphs.append(LawParagraph(
+                text,
+                style=style_names[style_id],
+                font_size=font_size,
+                is_bold=is_bold,
+                is_italic=is_italic,
+                alignment=alignment,
+                is_law_section=self._is_law_section(text),  # 是否是法律法规关键部分
+                hierarchy_level=self._get_hierarchy_level(text)  # 获取层级
+            ))
+        
+        # 处理表格（同doc.tables，只取正文下的直接子表格）
+        for tbl in body.iterchildren(_W_TBL):
+            table_text = self._extract_table_text(tbl)
             if table_text:
-                paragraphs.append({
-                    'text': table_text,
-                    'original_text': table_text,
-                    'style': 'Table',
-                    'font_size': 10,
-                    'is_bold': False,
-                    'is_italic': False,
-                    'alignment': 'LEFT',
-                    'keep': True,
-                    'is_law_section': False,
-                    'hierarchy_level': 0
-                })
+                paragraphs.append(LawParagraph(table_text, style='Table', font_size=10))
         
         return paragraphs
     
-    def _is_table_content(self, para) -> bool:
+    def _is_table_content(self, text: str) -> bool:
         """判断是否为表格内容"""
         # 简单的表格内容检测
-        text = para.text
-        if any(char in text for char in ['┌', '┐', '└', '┘', '├', '┤', '┬', '┴', '─', '│', '┃']):
-            return True
-        return False
+        return not self._TABLE_CHARS.isdisjoint(text)
     
-    def _is_header_footer(self, para) -> bool:
+    def _is_header_footer(self, text: str) -> bool:
         """判断是否为页眉页脚"""
-        text = para.text
-        
         # 检查页眉页脚关键词
-        for pattern in self.noise_patterns['header_footer_keywords']:
-            if re.search(pattern, text, re.IGNORECASE):
+        if self._header_footer_matcher.search(text):
+            return True
+        for pattern in self._header_footer_regexes:
+            if pattern.search(text):
                 return True
         
         # 检查页眉页脚的常见位置特征
@@ -192,63 +386,56 @@ class LawDocumentCleaner:
             return True
         
         # 检查是否是文件编号
-        if re.search(r'[〔〔\]【】]', text) and len(text) < 30:
+        if len(text) < 30 and not self._FILE_NUMBER_BRACKETS.isdisjoint(text):
             return True
         
         return False
     
-    def _is_law_section(self, text: str) -> bool:
+    # 以下两个判断只依赖文本本身，按文本缓存结果（法规中的重复条文、目录与正文重复的标题可直接命中）
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def _is_law_section(cls, text: str) -> bool:
         """判断是否是法律法规关键部分"""
-        for section in self.law_sections:
-            if section in text:
-                return True
-        return False
+        return cls._law_section_matcher.search(text)
     
-    def _get_hierarchy_level(self, text: str) -> int:
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def _get_hierarchy_level(cls, text: str) -> int:
         """获取文本的层级（用于结构化）"""
-        # 第X章 - 层级1
-        if re.match(r'^第[一二三四五六七八九十]+章', text) or re.match(r'^第\d+章', text):
-            return 1
-        # 第X节 - 层级2
-        elif re.match(r'^第[一二三四五六七八九十]+节', text) or re.match(r'^第\d+节', text):
-            return 2
-        # 第一条 - 层级3
-        elif re.match(r'^第[一二三四五六七八九十]+条', text) or re.match(r'^第\d+条', text):
-            return 3
-        # 第X款 - 层级4
-        elif re.match(r'^第[一二三四五六七八九十]+款', text) or re.match(r'^第\d+款', text):
-            return 4
-        # (X) - 层级5
-        elif re.match(r'^\([一二三四五六七八九十]+\)', text) or re.match(r'^\(\d+\)', text):
-            return 5
+        # 层级标题都以"第"或"("开头，先看首字符，多数正文段落无需尝试正则
+        if text[:1] in ('第', '('):
+            m = cls._HIERARCHY_RE.match(text)
+            if m:
+                unit = m.group('unit')
+                return cls._HIERARCHY_UNIT_LEVELS[unit] if unit else 5
+        
         # 其他重要标题 - 层级2
-        elif any(keyword in text for keyword in ['总则', '分则', '附则', '法律责任', '罚则']):
+        if cls._title_keyword_matcher.search(text):
             return 2
-        else:
-            return 0
-    
-    def _get_font_size(self, para) -> float:
-        """获取字体大小"""
-        try:
-            if para.runs:
-                return para.runs[0].font.size.pt if para.runs[0].font.size else 11
-        except:
-            pass
-        return 11.0
-    
-    def _is_bold(self, para) -> bool:
-        """判断是否为粗体"""
-        if para.runs:
-            return para.runs[0].bold or False
-        return False
-    
-    def _is_italic(self, para) -> bool:
-        """判断是否为斜体"""
-        if para.runs:
-            return para.runs[0].italic or False
-        return False
-    
-    def _get_alignment(self, para):
+        return 0
+    
+    def _get_paragraph_format(self, p) -> Tuple[float, bool, bool, str]:
+        """从<w:p>元素读取段落格式: (字体大小, 是否粗体, 是否斜体, 对齐方式)
+        
+        只看第一个<w:r>的<w:rPr>（sz/b/i）以及段落的<w:jc>。
+        """
+        font_size, is_bold, is_italic = 11.0, False, False
+        r = p.find(_W_R)
+        if r is not None:
+            font_size = 11
+            rPr = r.rPr
+            if rPr is not None:
+                try:
+                    size = rPr.sz_val
+                    font_size = size.pt if size else 11
+                except:
+                    pass
+                is_bold = rPr.b is not None and rPr.b.val
+                is_italic = rPr.i is not None and rPr.i.val
+        
+        return font_size, is_bold, is_italic, self._get_alignment(p)
+    
+    def _get_alignment(self, para) -> str:
         """获取对齐方式"""
         try:
             align_map = {
@@ -261,14 +448,15 @@ class LawDocumentCleaner:
         except:
             return 'LEFT'
     
-    def _extract_table_text(self, table) -> str:
-        """提取表格文本"""
+    def _extract_table_text(self, tbl) -> str:
+        """提取表格文本（直接读取<w:tbl>元素，不创建Table/Row/Cell对象）"""
         table_text = []
         
-        for row in table.rows:
+        for tr in tbl.iterchildren(_W_TR):
             row_text = []
-            for cell in row.cells:
-                cell_text = cell.text.strip()
+            # 每个<w:tc>只读取一次，合并单元格的内容不再按跨越的列/行重复
+            for tc in tr.iterchildren(_W_TC):
+                cell_text = '\n'.join(p.text for p in tc.iterchildren(_W_P)).strip()
                 if cell_text:
                     row_text.append(cell_text)
             if row_text:
@@ -277,266 +465,127 @@ class LawDocumentCleaner:
         
         return '\n'.join(table_text) if table_text else ''
     
-    def _remove_headers_footers(self, paragraphs: List[Dict]) -> List[Dict]:
-        """移除页眉页脚"""
-        cleaned = []
+    def _process_paragraph(self, index: int, para: LawParagraph) -> Optional[LawParagraph]:
+        """
+        对单个段落依次执行清洗步骤
         
-        for i, para in enumerate(paragraphs):
-            text = para['text']
-            
-            # 跳过页眉页脚
-            if self._is_header_footer_text(text):
-                continue
+        Args:
+            index: 段落在提取结果中的序号
+            para: 段落信息
             
-            # 检查是否是文件头信息（如"国务院令第XXX号"）
-            if i < 3:  # 前3行可能是文件头
-                if self._is_document_header(text):
-                    # 保留重要的文件头信息
-                    if not any(keyword in text for keyword in ['令', '公告', '通知', '决定']):
-                        continue
-            
-            cleaned.append(para)
+        Returns:
+            清洗后的段落，返回None表示丢弃
+        """
+        # 提取时已去除首尾空白，以下各项判断不再重复strip
+        text = para.text
         
-        return cleaned
+        # 移除页眉页脚、页码、脚注和装饰线
+        if self._is_removable_header_footer(index, text):
+            return None
+        if self._is_page_number(text):
+            return None
+        if self._is_footnote(text):
+            return None
+        if self._is_decoration_line(text):
+            return None
+        
+        # 清理格式，清理后无内容则丢弃
+        text = self._clean_formatting(text)
+        if not text:
+            return None
+        
+        # 标准化内容
+        para.text = self._standardize_content(text)
+        return para
+    
+    def _is_removable_header_footer(self, index: int, text: str) -> bool:
+        """判断段落是否为应移除的页眉页脚或文件头"""
+        # 跳过页眉页脚
+        if self._is_header_footer_text(text):
+            return True
+        
+        # 检查是否是文件头信息（如"国务院令第XXX号"）
+        if index < 3:  # 前3行可能是文件头
+            if self._is_document_header(text):
+                # 保留重要的文件头信息
+                if not any(keyword in text for keyword in ['令', '公告', '通知', '决定']):
+                    return True
+        
+        return False
     
     def _is_document_header(self, text: str) -> bool:
-        """判断是否为文件头信息"""
-        patterns = [
-            r'.*令第\d+号',
-            r'.*公告第\d+号',
-            r'.*通知第\d+号',
-            r'^【.*】$',
-            r'^〔.*〕$'
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, text):
+        """判断是否为文件头信息（text需已去除首尾空白）"""
+        for pattern in self._DOCUMENT_HEADER_PATTERNS:
+            if pattern.match(text):
                 return True
         return False
     
     def _is_header_footer_text(self, text: str) -> bool:
-        """判断文本是否为页眉页脚内容"""
+        """判断文本是否为页眉页脚内容（text需已去除首尾空白）"""
         text_lower = text.lower()
         
         # 常见的页眉页脚关键词
-        header_footer_indicators = [
-            'confidential', 'internal', 'draft',
-            'page', '页码', '第.*页',
-            '文件编号', 'document no',
-            '印发日期', '发布日期'
-        ]
-        
-        for indicator in header_footer_indicators:
-            if re.search(indicator, text_lower):
+        for indicator in self._HEADER_FOOTER_INDICATORS:
+            if indicator.search(text_lower):
                 return True
         
         return False
     
-    def _remove_page_numbers(self, paragraphs: List[Dict]) -> List[Dict]:
-        """移除页码"""
-        cleaned = []
-        
-        for para in paragraphs:
-            text = para['text']
-            
-            # 跳过明显的页码
-            is_page_number = False
-            for pattern in self.noise_patterns['page_numbers']:
-                if re.match(pattern, text.strip()):
-                    is_page_number = True
-                    break
-            
-            if not is_page_number:
-                cleaned.append(para)
-        
-        return cleaned
+    def _is_page_number(self, text: str) -> bool:
+        """判断是否为页码（text需已去除首尾空白）"""
+        # 页码都很短（如"- 12 -"、"3/10"），超过10个字符的段落直接跳过正则
+        if len(text) > 10:
+            return False
+        return self._page_number_re.match(text) is not None
     
-    def _remove_footnotes(self, paragraphs: List[Dict]) -> List[Dict]:
-        """移除脚注"""
-        cleaned = []
-        
-        for para in paragraphs:
-            text = para['text']
-            
-            # 检查是否是脚注
-            is_footnote = False
-            for pattern in self.noise_patterns['footnotes']:
-                if re.match(pattern, text):
-                    is_footnote = True
-                    break
-            
-            if not is_footnote:
-                cleaned.append(para)
-        
-        return cleaned
+    def _is_footnote(self, text: str) -> bool:
+        """判断是否为脚注"""
+        return self._footnote_re.match(text) is not None
     
-    def _remove_decoration_lines(self, paragraphs: List[Dict]) -> List[Dict]:
-        """移除装饰线"""
-        cleaned = []
-        
-        for para in paragraphs:
-            text = para['text']
-            
-            # 检查是否是装饰线
-            is_decoration = False
-            for pattern in self.noise_patterns['decoration_lines']:
-                if re.match(pattern, text.strip()):
-                    is_decoration = True
-                    break
-            
-            if not is_decoration:
-                cleaned.append(para)
-        
-        return cleaned
+    def _is_decoration_line(self, text: str) -> bool:
+        """判断是否为装饰线（text需已去除首尾空白）"""
+        return self._decoration_re.match(text) is not None
     
-    def _clean_formatting(self, paragraphs: List[Dict]) -> List[Dict]:
+    def _clean_formatting(self, text: str) -> str:
         """清理格式"""
-        cleaned = []
+        # 移除多余的空格
+        text = self.noise_patterns['excessive_spaces'].sub(' ', text)
         
-        for para in paragraphs:
-            text = para['original_text']  # 使用原始文本进行清理
-            
-            # 移除多余的空格
-            text = re.sub(self.noise_patterns['excessive_spaces'], ' ', text)
-            
-            # 移除特殊符号（除非是列表符号或引用符号）
-            if not text.startswith(('•', '-', '1.', '2.', '3.', '（', '(', '《', '[')):
-                text = re.sub(self.noise_patterns['special_chars'], '', text)
-            
-            # 清理行首行尾空格
-            text = text.strip()
-            
-            # 如果清理后还有内容，则保留
-            if text:
-                para['text'] = text
-                cleaned.append(para)
+        # 移除特殊符号（除非是列表符号、编号或引用符号）
+        first = text[:1]
+        if not (first in self._KEEP_PREFIX_CHARS
+                or ('1' <= first <= '9' and text[1:2] == '.')):
+            text = self.noise_patterns['special_chars'].sub('', text)
         
-        return cleaned
+        # 清理行首行尾空格
+        return text.strip()
     
-    def _standardize_content(self, paragraphs: List[Dict]) -> List[Dict]:
-        """标准化内容"""
-        cleaned = []
-        
-        for i, para in enumerate(paragraphs):
-            text = para['text']
-            
-            # 标准化条款编号
-            text = self._standardize_clause_numbers(text)
-            
-            # 标准化日期格式
-            text = self._standardize_dates(text)
-            
-            # 标准化法律引用
-            text = self._standardize_law_references(text)
-            
-            # 标准化金额和数字
-            text = self._standardize_numbers(text)
-            
-            para['text'] = text
-            cleaned.append(para)
-        
-        return cleaned
+    def _standardize_content(self, text: str) -> str:
+        """标准化内容：条款编号、日期格式、法律引用、金额和数字（一遍替换）"""
+        if _STANDARDIZE_TRIGGER_RE.search(text) is None:
+            return text
+        return _STANDARDIZE_RE.sub(_standardize_repl, text)
     
-    def _standardize_clause_numbers(self, text: str) -> str:
-        """标准化条款编号"""
-        # 将中文数字条款标准化
-        replacements = [
-            (r'第([一二三四五六七八九十])章', lambda m: f'第{self._chinese_to_number(m.group(1))}章'),
-            (r'第([一二三四五六七八九十])节', lambda m: f'第{self._chinese_to_number(m.group(1))}节'),
-            (r'第([一二三四五六七八九十])条', lambda m: f'第{self._chinese_to_number(m.group(1))}条'),
-            (r'第([一二三四五六七八九十])款', lambda m: f'第{self._chinese_to_number(m.group(1))}款'),
-            (r'\(([一二三四五六七八九十])\)', lambda m: f'({self._chinese_to_number(m.group(1))})'),
-        ]
-        
-        for pattern, replacement in replacements:
-            text = re.sub(pattern, replacement, text)
-        
-        return text
-    
-    def _chinese_to_number(self, chinese: str) -> str:
-        """中文数字转阿拉伯数字"""
-        chinese_map = {
-            '一': '1', '二': '2', '三': '3', '四': '4', '五': '5',
-            '六': '6', '七': '7', '八': '8', '九': '9', '十': '10',
-            '十一': '11', '十二': '12', '十三': '13', '十四': '14', '十五': '15',
-            '十六': '16', '十七': '17', '十八': '18', '十九': '19', '二十': '20'
-        }
-        return chinese_map.get(chinese, chinese)
-    
-    def _standardize_dates(self, text: str) -> str:
-        """标准化日期格式"""
-        # 统一日期格式为 YYYY年MM月DD日
-        patterns = [
-            (r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})', r'\1年\2月\3日'),
-            (r'(\d{4})\.(\d{1,2})\.(\d{1,2})', r'\1年\2月\3日'),
-            (r'(\d{4})年(\d{1,2})月(\d{1,2})号', r'\1年\2月\3日'),
-        ]
-        
-        for pattern, replacement in patterns:
-            text = re.sub(pattern, replacement, text)
-        
-        return text
-    
-    def _standardize_law_references(self, text: str) -> str:
-        """标准化法律引用"""
-        # 统一法律引用格式
-        patterns = [
-            (r'《\s*([^》]+)\s*》\s*第\s*(\d+)\s*条', r'《\1》第\2条'),
-            (r'《\s*([^》]+)\s*》\s*第\s*([一二三四五六七八九十]+)\s*条', 
-             lambda m: f'《{m.group(1)}》第{self._chinese_to_number(m.group(2))}条'),
-        ]
-        
-        for pattern, replacement in patterns:
-            text = re.sub(pattern, replacement, text)
-        
-        return text
-    
-    def _standardize_numbers(self, text: str) -> str:
-        """标准化数字格式"""
-        # 统一数字格式
-        patterns = [
-            (r'(\d+)[,，](\d{3})', r'\1\2'),  # 移除千分位逗号
-            (r'(\d+)万元', r'\1万元'),
-            (r'(\d+)元人民币', r'\1元'),
-            (r'百分之(\d+)', r'\1%'),
-        ]
-        
-        for pattern, replacement in patterns:
-            text = re.sub(pattern, replacement, text)
-        
-        return text
-    
-    def _reconstruct_structure(self, paragraphs: List[Dict]) -> List[Dict]:
+    def _reconstruct_structure(self, paragraphs: List[LawParagraph]) -> List[LawParagraph]:
         """重构文档结构"""
         cleaned = []
         
         for i, para in enumerate(paragraphs):
             # 根据层级添加空行以增强可读性
-            if para['hierarchy_level'] > 0 and i > 0:
+            if para.hierarchy_level > 0 and i > 0:
                 # 在不同层级的标题前添加空行
-                if para['hierarchy_level'] <= 2:  # 章、节级别
+                if para.hierarchy_level <= 2:  # 章、节级别
                     cleaned.append(self._create_empty_paragraph())
-                elif para['hierarchy_level'] == 3:  # 条级别
+                elif para.hierarchy_level == 3:  # 条级别
                     cleaned.append(self._create_empty_paragraph(font_size=0.5))
             
             cleaned.append(para)
         
         return cleaned
     
-    def _create_empty_paragraph(self, font_size: float = 1.0) -> Dict:
+    def _create_empty_paragraph(self, font_size: float = 1.0) -> LawParagraph:
         """创建空段落"""
-        return {
-            'text': '',
-            'original_text': '',
-            'style': 'Empty',
-            'font_size': font_size,
-            'is_bold': False,
-            'is_italic': False,
-            'alignment': 'LEFT',
-            'keep': True,
-            'is_law_section': False,
-            'hierarchy_level': 0
-        }
+        return LawParagraph('', style='Empty', font_size=font_size)
     
     def _setup_document_format(self, doc: Document):
         """设置文档格式"""
@@ -554,43 +603,43 @@ class LawDocumentCleaner:
             heading_font.size = Pt(16 - (i-1) * 2)
             heading_font.bold = True
     
-    def _add_cleaned_content(self, doc: Document, paragraphs: List[Dict]):
+    def _add_cleaned_content(self, doc: Document, paragraphs: List[LawParagraph]):
         """添加清洗后的内容"""
         for para_info in paragraphs:
-            text = para_info['text']
+            text = para_info.text
             
             # 跳过空段落（占位用）
-            if para_info['style'] == 'Empty':
+            if para_info.style == 'Empty':
                 p = doc.add_paragraph()
-                p.paragraph_format.space_after = Pt(para_info['font_size'] * 12)
+                p.paragraph_format.space_after = Pt(para_info.font_size * 12)
                 continue
             
             # 根据样式添加段落
-            if para_info['style'] == 'Table':
+            if para_info.style == 'Table':
                 # 表格内容特殊处理
                 p = doc.add_paragraph()
                 p.add_run('[表格内容]').italic = True
                 doc.add_paragraph(text)
             
-            elif para_info['hierarchy_level'] > 0:
+            elif para_info.hierarchy_level > 0:
                 # 使用相应的标题样式
-                heading_level = min(para_info['hierarchy_level'], 3)
+                heading_level = min(para_info.hierarchy_level, 3)
                 p = doc.add_paragraph(text, style=f'Heading {heading_level}')
                 
                 # 设置对齐方式
-                if para_info['alignment'] == 'CENTER':
+                if para_info.alignment == 'CENTER':
                     p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                elif para_info['alignment'] == 'RIGHT':
+                elif para_info.alignment == 'RIGHT':
                     p.alignment = WD_ALIGN_PARAGRAPH.RIGHT
             
-            elif para_info['is_bold'] and para_info['font_size'] > 12:
+            elif para_info.is_bold and para_info.font_size > 12:
                 # 重要标题加粗
                 p = doc.add_paragraph()
                 run = p.add_run(text)
                 run.bold = True
                 run.font.size = Pt(14)
             
-            elif para_info['is_italic']:
+            elif para_info.is_italic:
                 # 斜体内容（通常是说明或注释）
                 p = doc.add_paragraph()
                 run = p.add_run(text)
@@ -601,21 +650,34 @@ class LawDocumentCleaner:
                 p = doc.add_paragraph(text)
             
             # 设置段落格式
-            if para_info['hierarchy_level'] == 0:  # 普通正文
+            if para_info.hierarchy_level == 0:  # 普通正文
                 p.paragraph_format.first_line_indent = Pt(24)  # 首行缩进2字符
             p.paragraph_format.line_spacing = 1.5  # 1.5倍行距
             p.paragraph_format.space_after = Pt(6)
 
 
-def process_law_documents_folder(input_dir: str, output_dir: str):
-    """处理整个文件夹的法律法规文档"""
+# 工作进程内复用的清洗器（由_init_worker创建）
+_worker_cleaner: Optional[LawDocumentCleaner] = None
+
+
+def _init_worker():
+    """工作进程初始化：每个进程只创建一次清洗器"""
+    global _worker_cleaner
+    _worker_cleaner = LawDocumentCleaner()
+
+
+def _clean_one(args: Tuple[str, str]) -> bool:
+    """在工作进程中清洗单个文档（各文件之间无共享状态）"""
+    input_path, output_path = args
+    return _worker_cleaner.clean_document(input_path, output_path)
+
+
+def process_law_documents_folder(input_dir: str, output_dir: str, max_workers: Optional[int] = None):
+    """处理整个文件夹的法律法规文档（多进程并行，max_workers默认为CPU核数）"""
     
     # 创建输出目录
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
-    # 初始化清洗器
-    cleaner = LawDocumentCleaner()
-    
     # 统计信息
     processed_count = 0
     failed_count = 0
@@ -624,14 +686,17 @@ def process_law_documents_folder(input_dir: str, output_dir: str):
     input_path = Path(input_dir)
     
     # 支持的文件扩展名
-    valid_extensions = ['.docx', '.doc']
+    valid_extensions = ('.docx', '.doc')
     
-    # 收集所有文件
+    # 收集所有文件（只遍历一次目录树，扩展名不区分大小写）
     all_files = []
-    for ext in valid_extensions:
-        all_files.extend(list(input_path.rglob(f'*{ext}')))
-        all_files.extend(list(input_path.rglob(f'*{ext.upper()}')))
+    for root, _, files in os.walk(input_path):
+        for name in files:
+            if name.lower().endswith(valid_extensions):
+                all_files.append(Path(root) / name)
     
+    # 规划输出路径
+    plan = []
     for file_path in all_files:
         # 构建输出路径
         relative_path = file_path.relative_to(input_path)
@@ -643,9 +708,14 @@ def process_law_documents_folder(input_dir: str, output_dir: str):
         # 修改输出文件名为 cleaned_原文件名
         cleaned_name = f"{file_path.stem}.docx"
         output_file = output_path.parent / cleaned_name
-        
-        # 清洗文档
-        if cleaner.clean_document(str(file_path), str(output_file)):
+        plan.append((str(file_path), str(output_file)))
+    
+    # 并行清洗文档
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        results = list(executor.map(_clean_one, plan))
+    
+    for file_path, success in zip(all_files, results):
+        if success:
             processed_count += 1
             logger.info(f"成功处理: {file_path.name}")
         else:
@@ -661,32 +731,43 @@ def process_law_documents_folder(input_dir: str, output_dir: str):
     generate_law_cleaning_report(output_dir, processed_count, failed_count)
 
 
+# 清洗报告模板
+_LAW_CLEANING_REPORT_TEMPLATE = """法律法规文档清洗报告
+{separator}
+
+清洗时间: {timestamp}
+成功处理的文件数: {success_count}
+处理失败的文件数: {failed_count}
+
+清洗操作包括:
+1. 移除页眉页脚和页码
+2. 移除目录、脚注和装饰线
+3. 清理多余空格和空行
+4. 标准化条款编号、日期和法律引用格式
+5. 标准化数字和金额格式
+6. 提取并处理表格内容
+7. 保留法律法规关键结构和条款
+8. 重构文档层级结构
+
+注意事项:
+- 保留了章、节、条、款等层级结构
+- 标准化了法律引用格式
+- 统一了日期和数字格式
+- 设置了首行缩进和行间距
+"""
+
+
 def generate_law_cleaning_report(output_dir: str, success_count: int, failed_count: int):
     """生成法律法规文档清洗报告"""
     report_path = Path(output_dir) / "law_cleaning_report.txt"
     
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write("法律法规文档清洗报告\n")
-        f.write("=" * 60 + "\n\n")
-        f.write(f"清洗时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"成功处理的文件数: {success_count}\n")
-        f.write(f"处理失败的文件数: {failed_count}\n")
-        f.write("\n")
-        f.write("清洗操作包括:\n")
-        f.write("1. 移除页眉页脚和页码\n")
-        f.write("2. 移除目录、脚注和装饰线\n")
-        f.write("3. 清理多余空格和空行\n")
-        f.write("4. 标准化条款编号、日期和法律引用格式\n")
-        f.write("5. 标准化数字和金额格式\n")
-        f.write("6. 提取并处理表格内容\n")
-        f.write("7. 保留法律法规关键结构和条款\n")
-        f.write("8. 重构文档层级结构\n")
-        f.write("\n")
-        f.write("注意事项:\n")
-        f.write("- 保留了章、节、条、款等层级结构\n")
-        f.write("- 标准化了法律引用格式\n")
-        f.write("- 统一了日期和数字格式\n")
-        f.write("- 设置了首行缩进和行间距\n")
+    # 一次性写入整份报告
+    report_path.write_text(_LAW_CLEANING_REPORT_TEMPLATE.format(
+        separator="=" * 60,
+        timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        success_count=success_count,
+        failed_count=failed_count,
+    ), encoding='utf-8')
     
     logger.info(f"清洗报告已生成: {report_path}")
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+向量模型加载模块 - rag.py、retriever_module.py和test_retrieval.py共用
+同一进程内的所有检索器共享已加载的模型
+"""
+
+import os
+from typing import Dict, Any, List
+
+# 向量模型推理后端："st"使用SentenceTransformer(PyTorch)，"onnx"使用ONNX Runtime
+EMBED_BACKEND = os.environ.get("EMBED_BACKEND", "st")
+
+def onnx_model_file(model_path: str) -> str:
+    """ONNX后端使用的模型文件（EMBED_ONNX_PATH，默认模型目录下的model.onnx）"""
+    return os.environ.get("EMBED_ONNX_PATH", os.path.join(model_path, "model.onnx"))
+
+def embedding_model_id(model_path: str) -> str:
+    """
+    实际使用的向量模型标识：推理后端+模型路径，ONNX后端再加上解析后的ONNX文件路径
+    用于缓存的key，换后端或换ONNX文件（如INT8模型）后不会取到其他模型算出的结果
+    """
+    if EMBED_BACKEND == "onnx":
+        return f"onnx\0{model_path}\0{os.path.abspath(onnx_model_file(model_path))}"
+    return f"{EMBED_BACKEND}\0{model_path}"
+
+class OnnxEmbeddingModel:
+    """
+    ONNX Runtime推理的向量模型，encode接口与SentenceTransformer一致
+    模型需先导出为ONNX（默认读取模型目录下的model.onnx，可用EMBED_ONNX_PATH指定），
+    输出last_hidden_state，这里做平均池化
+    """
+    
+    def __init__(self, model_path: str, max_length: int = 512):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        
+        onnx_path = onnx_model_file(model_path)
+        available = ort.get_available_providers()
+        providers = [p for p in ("CUDAExecutionProvider", "CPUExecutionProvider") if p in available]
+        self.session = ort.InferenceSession(onnx_path, providers=providers)
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path, use_fast=True)
+        self.max_length = max_length
+    
+    def encode(self, sentences: List[str], batch_size: int = 32, normalize_embeddings: bool = False, **kwargs):
+        """编码一批文本，返回numpy数组（其余参数与SentenceTransformer.encode兼容，忽略）"""
+        import numpy as np
+        
+        if not sentences:
+            return np.zeros((0, 0), dtype=np.float32)
+        
+        # 按长度排序后分批，减少padding
+        order = np.argsort([-len(s) for s in sentences], kind='stable')
+        all_embeddings = []
+        for start in range(0, len(sentences), batch_size):
+            batch = [sentences[i] for i in order[start:start + batch_size]]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors='np'
+            )
+            feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+            last_hidden_state = self.session.run(None, feeds)[0]
+            
+            # 平均池化
+            mask = encoded['attention_mask'][..., None].astype(last_hidden_state.dtype)
+            summed = (last_hidden_state * mask).sum(axis=1)
+            all_embeddings.append(summed / np.clip(mask.sum(axis=1), 1e-9, None))
+        
+        embeddings = np.empty((len(sentences), all_embeddings[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.vstack(all_embeddings)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+# 已加载的向量模型（按模型路径缓存），同一进程内多次创建检索器时不再重复从磁盘加载
+_MODEL_CACHE: Dict[str, Any] = {}
+
+def load_embedding_model(model_path: str) -> Any:
+    """
+    加载向量模型（同一路径只加载一次）
+    EMBED_BACKEND=onnx时使用ONNX Runtime；否则使用SentenceTransformer，有GPU时放到CUDA上并使用FP16推理
+    """
+    model = _MODEL_CACHE.get(model_path)
+    if model is None:
+        if EMBED_BACKEND == "onnx":
+            model = OnnxEmbeddingModel(model_path)
+            _MODEL_CACHE[model_path] = model
+            return model
+        
+        import torch
+        from sentence_transformers import SentenceTransformer
+        
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model = SentenceTransformer(model_path, device=device)
+        model.eval()
+        if device == "cuda":
+            model.half()
+        elif hasattr(os, "sched_getaffinity"):
+            # torch默认按物理核数设置线程数；进程被限制在更少的CPU上时降到可用CPU数，不超过默认值
+            torch.set_num_threads(max(1, min(torch.get_num_threads(), len(os.sched_getaffinity(0)))))
+        _MODEL_CACHE[model_path] = model
+    return model
+
+def encode_texts(model: Any, texts: List[str], **kwargs):
+    """
+    用load_embedding_model返回的模型编码文本，参数同SentenceTransformer.encode
+    PyTorch模型在inference_mode下推理（不记录autograd信息），ONNX模型不需要torch
+    """
+    if isinstance(model, OnnxEmbeddingModel):
+        return model.encode(texts, **kwargs)
+    
+    import torch
+    with torch.inference_mode():
+        return model.encode(texts, **kwargs)
@@ -8,33 +8,211 @@ import sys
 import os
 import json
 import argparse
+import asyncio
+import atexit
+import hashlib
+import queue
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import Dict, Any, Optional, List
+from collections import OrderedDict
 import re
 
+try:
+    import httpx  # 批量审查时并发调用API，可选依赖
+except ImportError:
+    httpx = None
+
+try:
+    import orjson  # 更快的JSON序列化，可选依赖
+except ImportError:
+    orjson = None
+
+try:
+    import diskcache  # 检索结果跨进程持久化缓存，可选依赖
+except ImportError:
+    diskcache = None
+
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # 共用的向量模型加载和结果格式化模块
+
+from embedding_model import embedding_model_id, encode_texts, load_embedding_model
+from retrieval_results import format_query_results
 
 # API配置
 API_URL = "http://localhost:8000/chat"
 
+# 查询向量编码的批大小（条款长度较均匀时可调大到128~1024）
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "32"))
+
+# 查询向量缓存：以(模型标识, 文本)的blake2b摘要为key做LRU缓存（模型标识包含推理后端和ONNX文件路径），
+# 进程退出时保存到磁盘（只保存当前模型维度的向量），下次启动时加载，重复审查相同条款时无需再次编码
+EMBED_CACHE_SIZE = 4096
+EMBED_CACHE_PATH = os.path.expanduser(
+    os.environ.get("EMBED_CACHE_PATH", "~/.cache/bank_rag/embeddings.npz")
+)
+_embed_cache: "OrderedDict[bytes, Any]" = OrderedDict()
+_embed_cache_state = {"loaded": False, "dirty": False}
+
+def _embedding_key(model_id: str, text: str) -> bytes:
+    """向量缓存的key（model_id来自embedding_model_id）"""
+    return hashlib.blake2b(f"{model_id}\0{text}".encode('utf-8'), digest_size=16).digest()
+
+def _load_embedding_cache():
+    """从磁盘加载向量缓存（每个进程只加载一次）"""
+    if _embed_cache_state["loaded"]:
+        return
+    _embed_cache_state["loaded"] = True
+    atexit.register(_save_embedding_cache)
+    
+    if not os.path.exists(EMBED_CACHE_PATH):
+        return
+    try:
+        import numpy as np
+        with np.load(EMBED_CACHE_PATH) as data:
+            for key, vector in zip(data['keys'], data['vectors']):
+                _embed_cache[key.tobytes()] = vector
+        while len(_embed_cache) > EMBED_CACHE_SIZE:
+            _embed_cache.popitem(last=False)
+        print(f"加载向量缓存: {len(_embed_cache)}条")
+    except Exception as e:
+        print(f"加载向量缓存失败: {e}")
+
+def _save_embedding_cache():
+    """
+    将向量缓存保存到磁盘（先写临时文件再替换，避免多进程写坏文件）
+    换过维度不同的向量模型时，只保存与最近使用的向量维度相同的条目
+    """
+    if not _embed_cache_state["dirty"] or not _embed_cache:
+        return
+    tmp_path = f"{EMBED_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        import numpy as np
+        shape = next(reversed(_embed_cache.values())).shape
+        items = [(key, vector) for key, vector in _embed_cache.items() if vector.shape == shape]
+        os.makedirs(os.path.dirname(EMBED_CACHE_PATH), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                keys=np.frombuffer(b''.join(key for key, _ in items), dtype=np.uint8).reshape(-1, 16),
+                vectors=np.stack([vector for _, vector in items])
+            )
+        os.replace(tmp_path, EMBED_CACHE_PATH)
+        _embed_cache_state["dirty"] = False
+    except Exception as e:
+        print(f"保存向量缓存失败: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+def _write_json_atomic(path: str, obj):
+    """写JSON文件（先写临时文件再替换，中途出错不会留下写了一半的文件）"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, path)
+
+def _create_session() -> requests.Session:
+    """
+    创建带连接池的HTTP会话，多次调用API时复用Keep-Alive连接
+    只对连接失败和网关错误(502/503/504)重试，读取超时不重试，避免长Prompt请求被重复执行
+    """
+    retry = Retry(
+        total=2,
+        read=0,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=None,  # 允许重试POST
+        raise_on_status=False  # 重试用尽后返回最后一次响应，由调用方处理状态码
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+_SESSION = _create_session()
+
+# httpx连接池上限（同步和批量异步调用共用）
+API_MAX_CONNECTIONS = int(os.environ.get("API_MAX_CONNECTIONS", "32"))
+API_MAX_KEEPALIVE = int(os.environ.get("API_MAX_KEEPALIVE", "16"))
+
+def _http2_available() -> bool:
+    """httpx的HTTP/2支持需要额外安装h2"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+_HTTP2 = httpx is not None and _http2_available()
+
+def _create_client():
+    """
+    创建持久的httpx客户端（未安装httpx时返回None，改用_SESSION）
+    安装了h2时启用HTTP/2（HTTPS服务可多路复用，多个请求共用一个连接）；连接失败重试2次
+    """
+    if httpx is None:
+        return None
+    limits = httpx.Limits(max_connections=API_MAX_CONNECTIONS, max_keepalive_connections=API_MAX_KEEPALIVE)
+    transport = httpx.HTTPTransport(http2=_HTTP2, limits=limits, retries=2)
+    return httpx.Client(transport=transport, timeout=httpx.Timeout(180.0, connect=10.0))
+
+_CLIENT = _create_client()
+
+# 网关错误时重试（与_SESSION的重试配置一致）
+_RETRY_STATUS = (502, 503, 504)
+_TIMEOUT_ERRORS = (requests.exceptions.Timeout,) + ((httpx.TimeoutException,) if httpx is not None else ())
+
+def _dumps_json(obj) -> bytes:
+    """序列化为UTF-8编码的JSON（有orjson时使用orjson）"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def _loads_json(content: bytes):
+    """解析JSON响应体（有orjson时使用orjson）"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+# 清理检索内容用的正则，模块加载时编译一次
+_SIMILARITY_RE = re.compile(r'\[相似度: [0-9.]+\]')
+_BRACKET_RE = re.compile(r'\[[^\]]*\]')
+
 def clean_document_content(doc: str) -> str:
     """清理文档内容，移除相似度信息等"""
     if not doc:
         return ""
     
     # 移除相似度信息
-    doc = re.sub(r'\[相似度: [0-9.]+\]', '', doc)
+    if '[相似度' in doc:
+        doc = _SIMILARITY_RE.sub('', doc)
     
     # 移除方括号内容（保留中文字符）
-    doc = re.sub(r'\[[^\]]*\]', '', doc)
-    
-    # 标准化空白
-    doc = re.sub(r'\s+', ' ', doc)
+    if '[' in doc:
+        doc = _BRACKET_RE.sub('', doc)
     
-    return doc.strip()
+    # 标准化空白并去掉首尾空白（split/join在C层完成，比正则替换快）
+    return ' '.join(doc.split())
+
+def get_read_timeout(prompt: str) -> int:
+    """根据Prompt长度确定API读取超时（秒）"""
+    prompt_len = len(prompt)
+    if prompt_len < 100:
+        return 30
+    elif prompt_len < 300:
+        return 60
+    elif prompt_len < 500:
+        return 120
+    else:
+        return 180
 
 def call_chatglm2_api(prompt: str, temperature: float = 0.7) -> Optional[str]:
     """
@@ -43,15 +221,7 @@ def call_chatglm2_api(prompt: str, temperature: float = 0.7) -> Optional[str]:
     print(f"调用API: {len(prompt)}字符, temperature={temperature}")
     
     # 根据Prompt长度动态设置超时
-    prompt_len = len(prompt)
-    if prompt_len < 100:
-        read_timeout = 30
-    elif prompt_len < 300:
-        read_timeout = 60
-    elif prompt_len < 500:
-        read_timeout = 120
-    else:
-        read_timeout = 180
+    read_timeout = get_read_timeout(prompt)
     
     print(f"设置超时: 10秒连接, {read_timeout}秒读取")
     
@@ -64,69 +234,105 @@ def call_chatglm2_api(prompt: str, temperature: float = 0.7) -> Optional[str]:
         "Content-Type": "application/json"
     }
     
+    body = _dumps_json(payload)
+    
     try:
         start_time = time.time()
-        response = requests.post(
-            API_URL,
-            json=payload,
-            headers=headers,
-            timeout=(10, read_timeout)
-        )
+        if _CLIENT is not None:
+            for attempt in range(3):
+                response = _CLIENT.post(
+                    API_URL,
+                    content=body,
+                    headers=headers,
+                    timeout=httpx.Timeout(read_timeout, connect=10)
+                )
+                if response.status_code not in _RETRY_STATUS or attempt == 2:
+                    break
+                time.sleep(0.2 * 2 ** attempt)
+        else:
+            response = _SESSION.post(
+                API_URL,
+                data=body,
+                headers=headers,
+                timeout=(10, read_timeout)
+            )
         elapsed_time = time.time() - start_time
         
         print(f"响应时间: {elapsed_time:.2f}秒")
         print(f"HTTP状态码: {response.status_code}")
         
         if response.status_code == 200:
-            result = response.json()
+            result = _loads_json(response.content)
+            # 服务端返回用量信息时打印（可查看前缀缓存命中的token数）
+            if result.get("usage"):
+                print(f"用量信息: {result['usage']}")
             return result.get("response", "")
         else:
             print(f"HTTP错误: {response.status_code}")
             print(f"错误响应: {response.text[:200]}")
             return None
     
-    except requests.exceptions.Timeout:
+    except _TIMEOUT_ERRORS:
         print(f"请求超时 (连接10秒/读取{read_timeout}秒)")
         return None
     except Exception as e:
         print(f"请求错误: {e}")
         return None
 
-def build_optimized_prompt(user_clause: str, retrieved_knowledge: str) -> str:
+async def call_chatglm2_api_async(client, prompt: str, temperature: float = 0.7) -> Optional[str]:
     """
-    构建优化的Prompt
+    异步调用ChatGLM2 API（批量审查时并发使用）
+    client: httpx.AsyncClient
     """
-    # 清理检索结果
-    lines = retrieved_knowledge.split('\n')
-    cleaned_refs = []
+    read_timeout = get_read_timeout(prompt)
     
-    for line in lines:
-        if line and not line.startswith('【'):
-            # 清理内容
-            cleaned = clean_document_content(line)
-            if cleaned:
-                # 如果还有编号，移除它
-                if '. ' in cleaned:
-                    cleaned = cleaned.split('. ', 1)[1]
-                cleaned_refs.append(cleaned[:80])  # 限制长度
+    payload = {
+        "prompt": prompt,
+        "temperature": temperature
+    }
     
-    # 构建参考资料部分
-    if cleaned_refs:
-        references = "【参考资料】\n" + "\n".join([f"{i+1}. {ref}" for i, ref in enumerate(cleaned_refs[:3])])
-    else:
-        references = "【参考资料】\n无相关参考资料。"
+    headers = {
+        "Content-Type": "application/json"
+    }
     
-    # 构建完整Prompt
-    prompt = f"""【角色设定】
-你是一名资深银行法律合规官。
+    try:
+        response = await client.post(
+            API_URL,
+            content=_dumps_json(payload),
+            headers=headers,
+            timeout=httpx.Timeout(read_timeout, connect=10)
+        )
+        
+        if response.status_code == 200:
+            result = _loads_json(response.content)
+            return result.get("response", "")
+        else:
+            print(f"HTTP错误: {response.status_code}")
+            print(f"错误响应: {response.text[:200]}")
+            return None
+    
+    except httpx.TimeoutException:
+        print(f"请求超时 (连接10秒/读取{read_timeout}秒)")
+        return None
+    except Exception as e:
+        print(f"请求错误: {e}")
+        return None
 
-【审查任务】
-请根据以下参考材料，审查合同条款。
+def build_simple_prompt(user_clause: str) -> str:
+    """构建简单模式Prompt（不使用知识库）"""
+    return f"""请审查以下银行合同条款：
 
-【待审条款】
 {user_clause}
 
-{references}
+请指出其中的风险并提供修改建议。"""
+
+# 优化模式Prompt的固定部分（角色、任务、要求、输出格式），每次请求都原样放在最前面，
+# 推理服务开启前缀缓存（如vLLM的prefix caching）时这部分的prefill可以在请求间复用，只需计算条款和参考资料
+OPTIMIZED_PROMPT_PREFIX = """【角色设定】
+你是一名资深银行法律合规官。
+
+【审查任务】
+请根据下方的参考资料，审查待审合同条款。
 
 【审查要求】
 1. 识别主要风险
@@ -143,27 +349,97 @@ def build_optimized_prompt(user_clause: str, retrieved_knowledge: str) -> str:
 修改建议：
 [具体修改文本]
 复核提示：
-[复核事项]"""
+[复核事项]
+
+"""
+
+def build_optimized_prompt(user_clause: str, retrieved_knowledge: str) -> str:
+    """
+    构建优化的Prompt
+    """
+    # 清理检索结果（只需要前3条参考资料，够数后不再处理后面的行）
+    cleaned_refs = []
+    for line in retrieved_knowledge.split('\n'):
+        if not line or line[0] == '【':
+            continue
+        # 清理内容
+        cleaned = clean_document_content(line)
+        if not cleaned:
+            continue
+        # 如果还有编号，移除它（编号只在行首，只在前8个字符内查找）
+        number_end = cleaned.find('. ', 0, 8)
+        if number_end != -1:
+            cleaned = cleaned[number_end + 2:]
+        cleaned_refs.append(f"{len(cleaned_refs) + 1}. {cleaned[:80]}")  # 限制长度
+        if len(cleaned_refs) == 3:
+            break
+    
+    # 构建参考资料部分
+    if cleaned_refs:
+        references = "【参考资料】\n" + "\n".join(cleaned_refs)
+    else:
+        references = "【参考资料】\n无相关参考资料。"
+    
+    # 构建完整Prompt：固定部分在前，条款和参考资料在后
+    prompt = f"""{OPTIMIZED_PROMPT_PREFIX}【待审条款】
+{user_clause}
+
+{references}"""
     
     return prompt
 
+# 向量检索后端："chroma"直接查询ChromaDB；"faiss"启动时把集合向量载入FAISS内存索引；
+# "numpy"把集合向量保存为FP16的.npy文件并以mmap方式加载，用矩阵乘法检索。后两者ChromaDB只作为数据源
+VECTOR_BACKEND = os.environ.get("VECTOR_BACKEND", "chroma")
+# numpy后端每次参与矩阵乘法的向量行数（FP16分块转为FP32计算，控制临时内存）
+NUMPY_SEARCH_CHUNK = 65536
+# 文档数超过该值时FAISS使用IVF-PQ近似索引，否则使用精确的IndexFlatIP
+FAISS_IVFPQ_THRESHOLD = 500000
+
+# 向量模型路径（可换成更小的模型，如text2vec-base-chinese、bge-small-zh-v1.5；换成不同的模型后需用同一模型重建知识库）
+# scripts/quantize_embedding_model.py导出的INT8模型只用于查询编码：通过EMBED_BACKEND=onnx和EMBED_ONNX_PATH指定，
+# 这里仍指向原模型目录（分词器从这里加载，建库脚本也用这里的原模型）
+EMBED_MODEL_PATH = os.environ.get("EMBED_MODEL_PATH", "/root/models/text2vec-large-chinese")
+
+# 检索结果缓存：相同条款、相同检索参数且集合文档数未变时直接返回上次的检索结果，跳过编码和向量检索
+# 安装了diskcache时同时保存到知识库目录下的retr_cache，多次运行之间复用
+RETRIEVAL_CACHE_SIZE = 1024
+
+def top_k_indices(similarities, k: int):
+    """
+    每行相似度最高的k个下标（按相似度从高到低）
+    先用argpartition在O(N)内选出前k个，再只对这k个排序，避免对整行做O(N log N)的全排序
+    """
+    import numpy as np
+    
+    k = min(k, similarities.shape[1])
+    if k <= 0:
+        return np.zeros((similarities.shape[0], 0), dtype=np.intp)
+    if k < similarities.shape[1]:
+        candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(k), (similarities.shape[0], k))
+    order = np.argsort(-np.take_along_axis(similarities, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
 class KnowledgeBaseRetriever:
     """简化的知识库检索器"""
     
     def __init__(
         self,
         kb_path: str = "../../knowledge_base",
-        embedding_model_path: str = "/root/models/text2vec-large-chinese",
+        embedding_model_path: str = EMBED_MODEL_PATH,
         collection_name: str = "contract_law_collection"
     ):
         """初始化检索器"""
         import chromadb
         from chromadb.config import Settings
-        from sentence_transformers import SentenceTransformer
         
         # 初始化向量模型
         print(f"加载向量模型: {embedding_model_path}")
-        self.embedding_model = SentenceTransformer(embedding_model_path)
+        self.embedding_model_path = embedding_model_path
+        self.embedding_model = load_embedding_model(embedding_model_path)
+        _load_embedding_cache()
         
         # 初始化ChromaDB客户端
         print(f"连接知识库: {kb_path}")
@@ -187,48 +463,335 @@ class KnowledgeBaseRetriever:
                 print(f"使用集合: {self.collection_name}")
             else:
                 raise ValueError("知识库中没有找到任何集合")
+        
+        self.kb_path = kb_path
+        self.faiss_index = None
+        self.numpy_embeddings = None
+        self._retrieval_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._retrieval_disk_cache = None
+        self._ids_fingerprint = self._collection_fingerprint()
+        if diskcache is not None:
+            try:
+                self._retrieval_disk_cache = diskcache.Cache(os.path.join(kb_path, "retr_cache"))
+            except Exception as e:
+                print(f"打开检索结果缓存失败: {e}")
+        if VECTOR_BACKEND == "faiss":
+            self._load_faiss_index()
+        elif VECTOR_BACKEND == "numpy":
+            self._load_numpy_embeddings()
+    
+    def _load_index_documents(self, ids: Optional[List[str]]):
+        """
+        从集合读取全部文档和元数据，按ids的顺序保存
+        ids为索引文件中保存的文档ID顺序；为None、或与集合当前的文档ID不一致（知识库已重建）时，
+        连同向量一起读取，按集合返回的顺序排列，由调用方重建索引
+        返回：(集合数据, 文档ID顺序, 是否需要重建索引)
+        """
+        if ids is not None:
+            data = self.collection.get(include=["documents", "metadatas"])
+            if len(ids) != len(data['ids']) or set(ids) != set(data['ids']):
+                print("索引文件与集合文档不一致，重新构建")
+                ids = None
+        if ids is None:
+            data = self.collection.get(include=["documents", "metadatas", "embeddings"])
+            ids = list(data['ids'])
+            rebuild = True
+        else:
+            rebuild = False
+        
+        position = {doc_id: i for i, doc_id in enumerate(data['ids'])}
+        order = [position[doc_id] for doc_id in ids]
+        metadatas = data['metadatas'] or [{}] * len(data['ids'])
+        self.index_documents = [data['documents'][i] for i in order]
+        self.index_metadatas = [metadatas[i] for i in order]
+        return data, ids, rebuild
+    
+    def _load_faiss_index(self):
+        """
+        从ChromaDB集合构建FAISS内存索引（向量已归一化，内积即余弦相似度）
+        索引和对应的文档ID保存在知识库目录下，集合文档数和文档ID不变时直接加载
+        """
+        import numpy as np
+        import faiss
+        
+        index_path = os.path.join(self.kb_path, f"{self.collection_name}.faiss")
+        ids_path = f"{index_path}.ids.json"
+        count = self.collection.count()
+        
+        index = None
+        ids = None
+        if os.path.exists(index_path) and os.path.exists(ids_path):
+            try:
+                index = faiss.read_index(index_path)
+                with open(ids_path, 'r', encoding='utf-8') as f:
+                    ids = json.load(f)
+                if not (index.ntotal == len(ids) == count):
+                    index, ids = None, None
+            except Exception as e:
+                print(f"加载FAISS索引失败: {e}")
+                index, ids = None, None
+        
+        data, ids, rebuild = self._load_index_documents(ids)
+        
+        if rebuild:
+            embeddings = np.asarray(data['embeddings'], dtype=np.float32)
+            faiss.normalize_L2(embeddings)
+            dim = embeddings.shape[1]
+            if len(embeddings) > FAISS_IVFPQ_THRESHOLD:
+                quantizer = faiss.IndexFlatIP(dim)
+                index = faiss.IndexIVFPQ(quantizer, dim, 1024, 16, 8, faiss.METRIC_INNER_PRODUCT)
+                index.train(embeddings)
+                index.nprobe = 32
+            else:
+                index = faiss.IndexFlatIP(dim)
+            index.add(embeddings)
+            try:
+                # 先删除旧的ID文件：中途出错时下次启动会重建，不会把新索引和旧ID配对使用
+                if os.path.exists(ids_path):
+                    os.remove(ids_path)
+                tmp_path = f"{index_path}.{os.getpid()}.tmp"
+                faiss.write_index(index, tmp_path)
+                os.replace(tmp_path, index_path)
+                _write_json_atomic(ids_path, ids)
+            except Exception as e:
+                print(f"保存FAISS索引失败: {e}")
+        
+        self.faiss_index = index
+        print(f"FAISS索引就绪: {index.ntotal}条")
+    
+    def _load_numpy_embeddings(self):
+        """
+        将集合向量归一化后以FP16保存为(N, d)的.npy文件，之后用mmap方式加载：
+        启动时不再从ChromaDB读取向量，内存和带宽占用减半，多个进程共享系统页缓存
+        """
+        import numpy as np
+        
+        embeddings_path = os.path.join(self.kb_path, f"{self.collection_name}.embeddings.f16.npy")
+        ids_path = f"{embeddings_path}.ids.json"
+        count = self.collection.count()
+        
+        embeddings = None
+        ids = None
+        if os.path.exists(embeddings_path) and os.path.exists(ids_path):
+            try:
+                embeddings = np.load(embeddings_path, mmap_mode='r')
+                with open(ids_path, 'r', encoding='utf-8') as f:
+                    ids = json.load(f)
+                if not (len(embeddings) == len(ids) == count):
+                    embeddings, ids = None, None
+            except Exception as e:
+                print(f"加载向量文件失败: {e}")
+                embeddings, ids = None, None
+        
+        data, ids, rebuild = self._load_index_documents(ids)
+        
+        if rebuild:
+            vectors = np.asarray(data['embeddings'], dtype=np.float32)
+            vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+            embeddings = vectors.astype(np.float16)
+            try:
+                # 先删除旧的ID文件：中途出错时下次启动会重建，不会把新向量和旧ID配对使用
+                if os.path.exists(ids_path):
+                    os.remove(ids_path)
+                tmp_path = f"{embeddings_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, embeddings)
+                os.replace(tmp_path, embeddings_path)
+                _write_json_atomic(ids_path, ids)
+                embeddings = np.load(embeddings_path, mmap_mode='r')
+            except Exception as e:
+                print(f"保存向量文件失败: {e}")
+        
+        self.numpy_embeddings = embeddings
+        print(f"向量文件就绪: {len(embeddings)}条")
+    
+    def _faiss_query(self, query_embeddings, n_results: int) -> Dict[str, Any]:
+        """在FAISS索引中检索，返回与collection.query相同的按列格式（距离为1-余弦相似度）"""
+        import numpy as np
+        
+        scores, indices = self.faiss_index.search(
+            np.ascontiguousarray(query_embeddings, dtype=np.float32),
+            min(n_results, self.faiss_index.ntotal)
+        )
+        return self._index_results(scores, indices)
+    
+    def _numpy_query(self, query_embeddings, n_results: int) -> Dict[str, Any]:
+        """用矩阵乘法在FP16向量上检索（分块转为FP32计算），返回与collection.query相同的按列格式"""
+        import numpy as np
+        
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        embeddings = self.numpy_embeddings
+        similarities = np.empty((len(queries), len(embeddings)), dtype=np.float32)
+        for start in range(0, len(embeddings), NUMPY_SEARCH_CHUNK):
+            chunk = np.asarray(embeddings[start:start + NUMPY_SEARCH_CHUNK], dtype=np.float32)
+            similarities[:, start:start + len(chunk)] = queries @ chunk.T
+        
+        indices = top_k_indices(similarities, n_results)
+        scores = np.take_along_axis(similarities, indices, axis=1)
+        return self._index_results(scores, indices)
+    
+    def _index_results(self, scores, indices) -> Dict[str, Any]:
+        """将索引返回的(相似度, 下标)矩阵转换为collection.query的按列格式（距离为1-余弦相似度，下标-1表示无结果）"""
+        import numpy as np
+        
+        documents, metadatas, distances = [], [], []
+        for row_scores, row_indices in zip(scores, indices):
+            valid = row_indices >= 0
+            row_indices = row_indices[valid]
+            documents.append([self.index_documents[i] for i in row_indices])
+            metadatas.append([self.index_metadatas[i] for i in row_indices])
+            distances.append((1.0 - row_scores[valid].astype(np.float64)).tolist())
+        return {'documents': documents, 'metadatas': metadatas, 'distances': distances}
+    
+    def encode_queries(self, texts: List[str]):
+        """
+        将一批文本编码为归一化向量（numpy数组）
+        已缓存的文本直接取缓存，其余文本去重后一次性编码
+        """
+        import numpy as np
+        
+        model_id = embedding_model_id(self.embedding_model_path)
+        keys = [_embedding_key(model_id, text) for text in texts]
+        vectors = {}
+        missing = {}  # key -> 文本
+        for key, text in zip(keys, texts):
+            if key in _embed_cache:
+                _embed_cache.move_to_end(key)
+                vectors[key] = _embed_cache[key]
+            else:
+                missing[key] = text
+        
+        if missing:
+            encoded = encode_texts(
+                self.embedding_model,
+                list(missing.values()),
+                batch_size=EMBED_BATCH_SIZE,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            for key, vector in zip(missing, encoded):
+                vectors[key] = vector
+                _embed_cache[key] = vector
+            while len(_embed_cache) > EMBED_CACHE_SIZE:
+                _embed_cache.popitem(last=False)
+            _embed_cache_state["dirty"] = True
+        
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
     
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
         """将文本转换为向量"""
-        embeddings = self.embedding_model.encode(
-            texts,
-            normalize_embeddings=True,
-            show_progress_bar=False
-        )
-        return embeddings.tolist()
+        return self.encode_queries(texts).tolist()
     
-    def search_by_text(self, query: str, n_results: int = 3) -> List[Dict[str, Any]]:
+    def search_by_text(
+        self,
+        query: str,
+        n_results: int = 3,
+        min_similarity: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
         """文本检索"""
-        # 获取查询向量
-        query_embedding = self.get_embeddings([query])[0]
+        return self.search_by_text_batch([query], n_results, min_similarity)[0]
+    
+    def search_by_text_batch(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        min_similarity: Optional[float] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        批量文本检索：所有查询一次编码、一次查询，避免逐条调用encode和collection.query的固定开销
+        返回：与queries一一对应的检索结果列表
+        """
+        if not queries:
+            return []
         
-        # 执行查询
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results,
-            include=["documents", "metadatas", "distances"]
-        )
+        # 获取查询向量
+        query_embeddings = self.encode_queries(queries)
         
-        formatted_results = []
-        if results and results['documents']:
-            for i in range(len(results['documents'][0])):
-                result = {
-                    'document': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
-                    'distance': results['distances'][0][i] if results['distances'] else None,
-                    'similarity': 1 - results['distances'][0][i] if results['distances'] else None
-                }
-                formatted_results.append(result)
+        # 所有查询向量一次传给向量索引，按查询顺序返回各自的结果
+        if self.faiss_index is not None:
+            results = self._faiss_query(query_embeddings, n_results)
+        elif self.numpy_embeddings is not None:
+            results = self._numpy_query(query_embeddings, n_results)
+        else:
+            results = self.collection.query(
+                query_embeddings=query_embeddings.tolist(),
+                n_results=n_results,
+                include=["documents", "metadatas", "distances"]
+            )
         
-        return formatted_results
+        return [format_query_results(results, i, min_similarity) for i in range(len(queries))]
     
-    def retrieve_for_clause(self, clause_text: str, n_results: int = 3):
+    def retrieve_for_clause(self, clause_text: str, n_results: int = 3, min_similarity: Optional[float] = None):
         """
         为指定合同条款检索相关知识
         返回：格式化后的检索结果字符串
         """
-        raw_results = self.search_by_text(clause_text, n_results)
-        return self._format_retrieval_results(raw_results)
+        return self.retrieve_for_clauses([clause_text], n_results, min_similarity)[0]
+    
+    def _collection_fingerprint(self) -> str:
+        """
+        集合文档ID的摘要（启动时计算一次）
+        导入脚本更新文件时会删除旧分块、以新ID重新写入，文档数可能不变，只有ID能反映知识库已更新
+        """
+        ids = self.collection.get(include=[])['ids']
+        return hashlib.blake2b('\0'.join(sorted(ids)).encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _retrieval_key(self, clause_text: str, n_results: int, min_similarity: Optional[float], version: int) -> str:
+        """
+        检索结果缓存的key（包含集合、向量检索后端、向量模型标识、检索参数、启动时的文档ID摘要和集合文档数，知识库更新后自动失效）
+        """
+        raw = (
+            f"{self.collection_name}\0{VECTOR_BACKEND}\0{embedding_model_id(self.embedding_model_path)}"
+            f"\0{n_results}\0{min_similarity}\0{self._ids_fingerprint}\0{version}\0{clause_text}"
+        )
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def retrieve_for_clauses(
+        self,
+        clause_texts: List[str],
+        n_results: int = 3,
+        min_similarity: Optional[float] = None
+    ) -> List[str]:
+        """
+        为一批合同条款检索相关知识（批量编码，命中检索结果缓存的条款不再检索）
+        返回：与clause_texts一一对应的格式化检索结果字符串
+        """
+        if not clause_texts:
+            return []
+        
+        version = self.collection.count()
+        keys = [self._retrieval_key(text, n_results, min_similarity, version) for text in clause_texts]
+        retrieved = {}
+        missing = {}  # key -> 条款
+        for key, text in zip(keys, clause_texts):
+            if key in retrieved or key in missing:
+                continue
+            if key in self._retrieval_cache:
+                self._retrieval_cache.move_to_end(key)
+                retrieved[key] = self._retrieval_cache[key]
+                continue
+            cached = self._retrieval_disk_cache.get(key) if self._retrieval_disk_cache is not None else None
+            if cached is not None:
+                retrieved[key] = cached
+            else:
+                missing[key] = text
+        
+        if missing:
+            for key, raw_results in zip(missing, self.search_by_text_batch(list(missing.values()), n_results, min_similarity)):
+                retrieved[key] = self._format_retrieval_results(raw_results)
+                if self._retrieval_disk_cache is not None:
+                    self._retrieval_disk_cache.set(key, retrieved[key])
+        
+        for key in retrieved:
+            self._retrieval_cache[key] = retrieved[key]
+            self._retrieval_cache.move_to_end(key)
+        while len(self._retrieval_cache) > RETRIEVAL_CACHE_SIZE:
+            self._retrieval_cache.popitem(last=False)
+        
+        return [retrieved[key] for key in keys]
     
     def _format_retrieval_results(self, raw_results: List[Dict[str, Any]]):
         """
@@ -265,9 +828,14 @@ class KnowledgeBaseRetriever:
             print(f"获取集合信息失败: {e}")
             return {}
 
-def run_complete_test(user_clause: str, retriever: KnowledgeBaseRetriever):
+def run_complete_test(
+    user_clause: str,
+    retriever: KnowledgeBaseRetriever,
+    retrieval_results: Optional[str] = None
+):
     """
     运行完整测试
+    retrieval_results: 已预取的检索结果（为None时在这里检索）
     """
     print(f"\n{'='*60}")
     print(f"审查条款: {user_clause}")
@@ -275,19 +843,23 @@ def run_complete_test(user_clause: str, retriever: KnowledgeBaseRetriever):
     
     # 1. 检索相关知识
     print("\n[1/4] 检索相关知识...")
-    try:
-        retrieval_results = retriever.retrieve_for_clause(user_clause, n_results=2)
-        print(f"检索完成")
-    except Exception as e:
-        print(f"检索失败: {e}")
-        retrieval_results = "检索失败，无参考资料。"
+    if retrieval_results is not None:
+        print(f"使用预取的检索结果")
+    else:
+        try:
+            retrieval_results = retriever.retrieve_for_clause(user_clause, n_results=2)
+            print(f"检索完成")
+        except Exception as e:
+            print(f"检索失败: {e}")
+            retrieval_results = "检索失败，无参考资料。"
     
     # 2. 构建优化Prompt
     print("[2/4] 构建优化Prompt...")
     enhanced_prompt = build_optimized_prompt(user_clause, retrieval_results)
     
     print(f"Prompt长度: {len(enhanced_prompt)}字符")
-    print(f"Prompt预览: {enhanced_prompt[:200]}...")
+    # 固定前缀每次都一样，预览从条款部分开始
+    print(f"Prompt预览: {enhanced_prompt[len(OPTIMIZED_PROMPT_PREFIX):][:200]}...")
     
     # 3. 调用API
     print("[3/4] 调用ChatGLM2 API...")
@@ -316,29 +888,189 @@ def run_complete_test(user_clause: str, retriever: KnowledgeBaseRetriever):
         "timestamp": datetime.now().isoformat()
     }
 
+class PrefetchRetriever:
+    """
+    后台预取检索结果：逐条审查时由后台线程提前检索后面的条款，
+    主线程等待API响应的同时完成下一条的编码和向量检索
+    """
+    
+    def __init__(self, retriever: KnowledgeBaseRetriever, clauses: List[str], n_results: int = 2, depth: int = 2):
+        self.retriever = retriever
+        self.clauses = clauses
+        self.n_results = n_results
+        self._queue = queue.Queue(maxsize=depth)
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+    
+    def _worker(self):
+        """按顺序检索所有条款，队列满时等待主线程取走结果"""
+        for clause in self.clauses:
+            try:
+                retrieval_results = self.retriever.retrieve_for_clause(clause, n_results=self.n_results)
+            except Exception as e:
+                print(f"检索失败: {e}")
+                retrieval_results = "检索失败，无参考资料。"
+            self._queue.put(retrieval_results)
+    
+    def next(self) -> str:
+        """按条款顺序取下一条检索结果"""
+        return self._queue.get()
+
+def run_sequential_batch(clauses: List[str], retriever: Optional[KnowledgeBaseRetriever]) -> List[Dict[str, Any]]:
+    """
+    逐条审查合同条款（API服务不支持并发请求时使用）
+    检索在后台线程预取，与API调用重叠执行；retriever为None时使用简单模式（不检索知识库）
+    """
+    if retriever is not None:
+        prefetch = PrefetchRetriever(retriever, clauses)
+        return [run_complete_test(clause, retriever, prefetch.next()) for clause in clauses]
+    
+    results = []
+    for index, clause in enumerate(clauses):
+        prompt = build_simple_prompt(clause)
+        start_time = time.time()
+        response = call_chatglm2_api(prompt, temperature=0.1)
+        elapsed_time = time.time() - start_time
+        
+        status = "完成" if response else "失败"
+        print(f"[{index + 1}/{len(clauses)}] {status}! 耗时: {elapsed_time:.1f}秒")
+        if not response:
+            response = "API调用失败。可能原因：\n1. API服务未运行\n2. Prompt过长导致超时\n3. 网络连接问题"
+        
+        results.append({
+            "clause": clause,
+            "mode": "simple",
+            "prompt": prompt,
+            "response": response,
+            "time_seconds": elapsed_time,
+            "timestamp": datetime.now().isoformat()
+        })
+    return results
+
+# 批量审查时同时进行的API请求数上限
+BATCH_CONCURRENCY = 16
+
+async def run_batch(clauses: List[str], retriever: Optional["KnowledgeBaseRetriever"]) -> List[Dict[str, Any]]:
+    """
+    批量审查合同条款：先批量检索知识，再并发调用API
+    retriever为None时使用简单模式（不检索知识库）
+    """
+    if httpx is None:
+        raise ImportError("批量审查需要安装httpx: pip install httpx")
+    
+    # 1. 批量检索相关知识并构建Prompt
+    if retriever is None:
+        retrieved = [None] * len(clauses)
+        prompts = [build_simple_prompt(clause) for clause in clauses]
+    else:
+        try:
+            retrieved = retriever.retrieve_for_clauses(clauses, n_results=2)
+        except Exception as e:
+            print(f"检索失败: {e}")
+            retrieved = ["检索失败，无参考资料。"] * len(clauses)
+        prompts = [
+            build_optimized_prompt(clause, retrieval_results)
+            for clause, retrieval_results in zip(clauses, retrieved)
+        ]
+    
+    # 2. 并发调用API（信号量限制同时进行的请求数）
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    limits = httpx.Limits(max_connections=API_MAX_CONNECTIONS, max_keepalive_connections=API_MAX_KEEPALIVE)
+    
+    async def review_one(client, index: int) -> Dict[str, Any]:
+        async with semaphore:
+            start_time = time.time()
+            response = await call_chatglm2_api_async(client, prompts[index], temperature=0.1)
+            elapsed_time = time.time() - start_time
+        
+        status = "完成" if response else "失败"
+        print(f"[{index + 1}/{len(clauses)}] {status}! 耗时: {elapsed_time:.1f}秒")
+        if not response:
+            response = "API调用失败。可能原因：\n1. API服务未运行\n2. Prompt过长导致超时\n3. 网络连接问题"
+        
+        result = {
+            "clause": clauses[index],
+            "prompt": prompts[index],
+            "response": response,
+            "time_seconds": elapsed_time,
+            "timestamp": datetime.now().isoformat()
+        }
+        if retriever is None:
+            result["mode"] = "simple"
+        else:
+            result["retrieved_knowledge"] = retrieved[index]
+        return result
+    
+    async with httpx.AsyncClient(limits=limits, http2=_HTTP2) as client:
+        return await asyncio.gather(*[review_one(client, i) for i in range(len(clauses))])
+
+def run_batch_test(clauses: List[str], retriever: Optional["KnowledgeBaseRetriever"]) -> List[Dict[str, Any]]:
+    """批量审查的同步入口"""
+    return asyncio.run(run_batch(clauses, retriever))
+
+def load_clauses(path: str) -> List[str]:
+    """读取批量审查文件，每行一个条款（忽略空行）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='银行合同审查AI - 完整修复版')
-    parser.add_argument('--clause', type=str, required=True,
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument('--clause', type=str,
                        help='要审查的合同条款文本')
+    input_group.add_argument('--batch-file', type=str,
+                       help='批量审查文件路径，每行一个合同条款，并发调用API')
     parser.add_argument('--output', type=str, default=None,
                        help='输出文件路径')
     parser.add_argument('--simple', action='store_true',
                        help='使用简单模式，不调用知识库')
+    parser.add_argument('--sequential', action='store_true',
+                       help='批量审查时逐条调用API（后台预取检索结果），不并发请求')
+    parser.add_argument('--model-path', type=str, default=EMBED_MODEL_PATH,
+                       help='向量模型路径（默认取环境变量EMBED_MODEL_PATH）')
     
     args = parser.parse_args()
+    if args.sequential and not args.batch_file:
+        parser.error("--sequential 只能与 --batch-file 一起使用")
     
     print("银行合同审查AI - 完整修复版")
     print("=" * 60)
     
+    # 批量模式：检索后并发调用API
+    if args.batch_file:
+        clauses = load_clauses(args.batch_file)
+        print(f"批量审查 {len(clauses)} 条条款...")
+        
+        retriever = None
+        if not args.simple:
+            try:
+                print("初始化知识库检索器...")
+                retriever = KnowledgeBaseRetriever(
+                    kb_path="../../knowledge_base",
+                    embedding_model_path=args.model_path,
+                    collection_name="contract_law_collection"
+                )
+            except Exception as e:
+                print(f"初始化失败: {e}")
+                print("回退到简单模式...")
+        
+        start_time = time.time()
+        if args.sequential:
+            results = run_sequential_batch(clauses, retriever)
+        else:
+            results = run_batch_test(clauses, retriever)
+        result = {
+            "mode": "batch",
+            "results": results,
+            "time_seconds": time.time() - start_time,
+            "timestamp": datetime.now().isoformat()
+        }
+    
     # 简单模式：直接调用API，不检索知识库
-    if args.simple:
+    elif args.simple:
         print("使用简单模式...")
-        prompt = f"""请审查以下银行合同条款：
-
-{args.clause}
-
-请指出其中的风险并提供修改建议。"""
+        prompt = build_simple_prompt(args.clause)
         
         response = call_chatglm2_api(prompt, temperature=0.1)
         
@@ -361,7 +1093,7 @@ def main():
             print("初始化知识库检索器...")
             retriever = KnowledgeBaseRetriever(
                 kb_path="../../knowledge_base",
-                embedding_model_path="/root/models/text2vec-large-chinese",
+                embedding_model_path=args.model_path,
                 collection_name="contract_law_collection"
             )
             
@@ -394,8 +1126,12 @@ def main():
     # 保存结果
     if args.output:
         try:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                with open(args.output, 'wb') as f:
+                    f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    json.dump(result, f, ensure_ascii=False, indent=2)
             print(f"\n结果已保存到: {args.output}")
         except Exception as e:
             print(f"保存结果失败: {e}")
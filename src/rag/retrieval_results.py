@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+检索结果格式化 - rag.py、retriever_module.py和test_retrieval.py共用
+"""
+
+from typing import Dict, Any, List, Optional
+
+def format_query_results(
+    results: Dict[str, Any],
+    index: int = 0,
+    min_similarity: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    将ChromaDB按列返回的第index个查询的结果转换为逐条的结果字典
+    相似度用numpy一次算出；指定min_similarity时只保留相似度不低于该值的结果
+    """
+    import numpy as np
+    
+    if not results or not results['documents']:
+        return []
+    
+    documents = results['documents'][index]
+    metadatas = results['metadatas'][index] if results['metadatas'] else [{}] * len(documents)
+    if not results['distances']:
+        return [
+            {'document': document, 'metadata': metadata, 'distance': None, 'similarity': None}
+            for document, metadata in zip(documents, metadatas)
+        ]
+    
+    distances = results['distances'][index]
+    similarities = 1.0 - np.asarray(distances, dtype=np.float64)
+    if min_similarity is None:
+        indices = range(len(documents))
+    else:
+        indices = np.flatnonzero(similarities >= min_similarity)
+    return [
+        {
+            'document': documents[i],
+            'metadata': metadatas[i],
+            'distance': distances[i],
+            'similarity': float(similarities[i])
+        }
+        for i in indices
+    ]
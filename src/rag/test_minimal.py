@@ -5,6 +5,26 @@
 
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def _create_session() -> requests.Session:
+    """创建带连接池的HTTP会话，两次测试请求复用同一连接"""
+    retry = Retry(
+        total=2,
+        read=0,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=None,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+_SESSION = _create_session()
 
 def test_minimal():
     """最小可行测试"""
@@ -43,7 +63,7 @@ def test_minimal():
     print(f"Prompt长度: {len(problematic_prompt)}")
     
     try:
-        response = requests.post(api_url, 
+        response = _SESSION.post(api_url, 
             json={"prompt": problematic_prompt, "temperature": 0.7}, 
             timeout=30)
         print(f"状态码: {response.status_code}")
@@ -58,7 +78,7 @@ def test_minimal():
     print(f"Prompt长度: {len(cleaned_prompt)}")
     
     try:
-        response = requests.post(api_url, 
+        response = _SESSION.post(api_url, 
             json={"prompt": cleaned_prompt, "temperature": 0.7}, 
             timeout=30)
         print(f"状态码: {response.status_code}")
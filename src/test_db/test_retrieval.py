@@ -6,14 +6,17 @@
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rag'))  # 共用的向量模型加载和结果格式化模块
 
 import chromadb
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 import numpy as np
 from typing import List, Dict, Any
 import logging
 
+from embedding_model import encode_texts, load_embedding_model
+from retrieval_results import format_query_results
+
 # 设置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -43,7 +46,7 @@ class KnowledgeBaseRetriever:
         
         # 初始化向量模型
         logger.info(f"加载向量模型: {embedding_model_path}")
-        self.embedding_model = SentenceTransformer(embedding_model_path)
+        self.embedding_model = load_embedding_model(embedding_model_path)
         
         # 初始化ChromaDB客户端
         logger.info(f"连接知识库: {kb_path}")
@@ -75,7 +78,8 @@ class KnowledgeBaseRetriever:
         """
         将文本转换为向量
         """
-        embeddings = self.embedding_model.encode(
+        embeddings = encode_texts(
+            self.embedding_model,
             texts,
             normalize_embeddings=True,
             show_progress_bar=False
@@ -118,18 +122,7 @@ class KnowledgeBaseRetriever:
         """
         raw_results = self.query_knowledge_base(query, n_results)
         
-        formatted_results = []
-        if raw_results and raw_results['documents']:
-            for i in range(len(raw_results['documents'][0])):
-                result = {
-                    'document': raw_results['documents'][0][i],
-                    'metadata': raw_results['metadatas'][0][i] if raw_results['metadatas'] else {},
-                    'distance': raw_results['distances'][0][i] if raw_results['distances'] else None,
-                    'similarity': 1 - raw_results['distances'][0][i] if raw_results['distances'] else None
-                }
-                formatted_results.append(result)
-        
-        return formatted_results
+        return format_query_results(raw_results)
     
     def get_collection_info(self) -> Dict[str, Any]:
         """获取集合信息"""